@@ -0,0 +1,68 @@
+import gzip
+import http.server
+import threading
+import time
+
+from data.constant import RequestMethod
+from data.parser.context import Invocation, invocation_context
+from data.parser.parser import ACCEPT_ENCODING, request
+
+
+NUMBER = 5
+ROWS = 20000
+
+
+def _html_table() -> bytes:
+    # Shaped like the MOPS dividend table, t05st09sub
+    rows = "".join(
+        f"<tr><td>{1000 + i % 9000}</td><td>公司{i}</td><td>113年</td><td>{i % 7}.{i % 100:02d}</td><td>0.00</td><td>{i % 3}.50</td></tr>\n"
+        for i in range(ROWS)
+    )
+    return f"<html><body><table class='hasBorder'>{rows}</table></body></html>".encode("utf-8")
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+
+    body = _html_table()
+    gzip_body = gzip.compress(body)
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        # Only gzip here, br and zstd encoders are not in the standard library
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body, encoding = self.gzip_body, "gzip"
+        else:
+            body, encoding = self.body, None
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        if encoding is not None:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def main():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/mops/web/ajax_t05st09_2"
+
+    for name, accept_encoding in (("identity", "identity"), (ACCEPT_ENCODING, ACCEPT_ENCODING)):
+        invocation = Invocation()
+        with invocation_context(invocation):
+            started = time.perf_counter()
+            for _ in range(NUMBER):
+                request(url, RequestMethod.GET, accept_encoding=accept_encoding)
+            seconds = (time.perf_counter() - started) / NUMBER
+
+        wire_bytes = sum(timing.size_download for timing in invocation.timings) // NUMBER
+        decoded_bytes = sum(timing.size_decoded for timing in invocation.timings) // NUMBER
+        print(f"{name:<20} wire {wire_bytes:>10} B  decoded {decoded_bytes:>10} B  ratio {decoded_bytes / wire_bytes:>6.1f}x  {seconds * 1e3:>8.2f} ms")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import timeit
+
+from data.parser.header import HeaderProfilePool, header_profiles
+
+
+NUMBER = 200
+
+
+def _cloud_scraper_user_agent():
+    from cloudscraper import CloudScraper
+
+    return CloudScraper().headers["User-Agent"]
+
+
+def main():
+    results = {}
+
+    try:
+        import cloudscraper # noqa: F401
+    except ImportError:
+        print("cloudscraper is not installed, skip CloudScraper baseline")
+    else:
+        results["CloudScraper() per request"] = timeit.timeit(_cloud_scraper_user_agent, number=NUMBER) / NUMBER
+
+    results["HeaderProfilePool() init"] = timeit.timeit(HeaderProfilePool, number=NUMBER) / NUMBER
+    results["header_profiles.user_agent()"] = timeit.timeit(header_profiles.user_agent, number=NUMBER * 100) / (NUMBER * 100)
+    results["header_profiles.user_agent(mobile=False)"] = timeit.timeit(lambda: header_profiles.user_agent(mobile=False), number=NUMBER * 100) / (NUMBER * 100)
+
+    for name, seconds in results.items():
+        print(f"{name:<45} {seconds * 1e6:>12.2f} us")
+
+
+if __name__ == "__main__":
+    main()
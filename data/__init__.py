@@ -1,10 +1,21 @@
+import asyncio
+import itertools
 import logging
 import json
+import time
+
+from collections import namedtuple
+
+from curl_cffi import requests as curl_requests
 
 from .cnyes import stock_price_history
 from .moneydj import etf_slice
 from .moneydj import tw_2y_index
 from .parser import DataParser
+from .parser.context import DEFAULT_RETRY_BUDGET, Invocation, invocation_context
+from .parser.latency import latency_tracker
+from .parser.loop import run
+from .parser.retry import RetryPolicy
 from .pocket import etf_dividend
 from .twse import dividend_announcement
 from .twse import dividend
@@ -18,27 +29,146 @@ from .twse import stocks_profit_sheet
 logger = logging.getLogger("data")
 
 
-def get(data_type: str, mobile: bool = True, desktop: bool = True, **kw):
-    logger.info(f"Request {data_type=} {mobile=} {desktop=} {kw=}")
+BatchResult = namedtuple("BatchResult", [
+        "data",
+        "exception",
+    ]
+)
+
+
+PARSERS = {
+    "stock_price_history": stock_price_history.parser,
+    "etf_slice": etf_slice.parser,
+    "tw_2y_index": tw_2y_index.MoneydjTWIndex2YPriceParser,
+    "etf_dividend": etf_dividend.parser,
+    "dividend_announcement_sorted_by_announcement_time": dividend_announcement.parser,
+    "dividend": dividend.parser,
+    "price_ratio": price_ratio.parser,
+    "revenue": revenue.parser,
+    "stock": stock.parser,
+    "stocks_balance_sheet": stocks_balance_sheet.parser,
+    "stocks_profit_sheet": stocks_profit_sheet.parser,
+}
+
+
+def _retry_delay(invocation: Invocation, attempt: int, exception: Exception) -> float | None:
+    if isinstance(exception, curl_requests.exceptions.RequestException):
+        return None # Already retried by the transport
+    delay = invocation.get_retry_policy(invocation.last_host).retry_delay(attempt, invocation.retry_budget, exception=exception)
+    if delay is not None and not invocation.within_deadline(delay):
+        logger.warning(f"No time left to retry {invocation.data_type} in {delay:.2f}s")
+        return None
+    if delay is not None:
+        logger.warning(f"Retry {invocation.data_type} in {delay:.2f}s after {type(exception).__name__}: {exception}")
+    return delay
+
+
+def _parse(invocation: Invocation, mobile: bool, desktop: bool, **kw) -> DataParser:
+    for attempt in itertools.count():
+        # A new parser for each attempt, parsers keep state while parsing
+        parser: DataParser = PARSERS[invocation.data_type](mobile, desktop, **kw)
+        try:
+            parser.parse_response()
+            return parser
+        except Exception as e:
+            if (delay := _retry_delay(invocation, attempt, e)) is None:
+                raise
+        time.sleep(delay)
 
-    parser: DataParser = {
-        "stock_price_history": stock_price_history.CnyesStockPriceHistoryParser,
-        "etf_slice": etf_slice.MoneydjETFSliceParser,
-        "tw_2y_index": tw_2y_index.MoneydjTWIndex2YPriceParser,
-        "etf_dividend": etf_dividend.PocketETFDividendParser,
-        "dividend_announcement_sorted_by_announcement_time": dividend_announcement.TwseDividendAnnouncementParser,
-        "dividend": dividend.TwseDividendHTMLParser,
-        "price_ratio": price_ratio.parser,
-        "revenue": revenue.TwseRevenueParser,
-        "stock": stock.TwseStockParser,
-        "stocks_balance_sheet": stocks_balance_sheet.TwseStocksBalanceSheetParser,
-        "stocks_profit_sheet": stocks_profit_sheet.TwseStocksProfitSheetParser,
-    }[data_type](mobile, desktop, **kw)
 
-    parser.parse_response()
+async def _parse_async(invocation: Invocation, mobile: bool, desktop: bool, **kw) -> DataParser:
+    for attempt in itertools.count():
+        parser: DataParser = PARSERS[invocation.data_type](mobile, desktop, **kw)
+        try:
+            await parser.parse_response_async()
+            return parser
+        except Exception as e:
+            if (delay := _retry_delay(invocation, attempt, e)) is None:
+                raise
+        await asyncio.sleep(delay)
 
+
+def _new_invocation(data_type: str, retry_policy: dict | None, retry_budget: int, hedge: bool, time_budget: float | None) -> Invocation:
+    if data_type not in PARSERS:
+        raise KeyError(data_type)
+
+    return Invocation(
+        data_type=data_type,
+        retry_policy=RetryPolicy(**retry_policy) if retry_policy is not None else None,
+        retry_budget=retry_budget,
+        hedge=hedge,
+        time_budget=time_budget,
+    )
+
+
+def _finish(invocation: Invocation, metadata: dict | None) -> None:
+    latency_tracker.save()
+    # Filled in for failed invocations too, that is when the timings matter most
+    if metadata is not None:
+        metadata["timings"] = [timing._asdict() for timing in invocation.timings]
+        metadata["wire_bytes"] = sum(timing.size_download or 0 for timing in invocation.timings)
+        metadata["decoded_bytes"] = sum(timing.size_decoded for timing in invocation.timings)
+
+
+def _data(parser: DataParser):
     data = parser.data
 
     json.dumps(data)
 
     return data
+
+
+def get(data_type: str, mobile: bool = True, desktop: bool = True, use_async: bool = False, retry_policy: dict | None = None, retry_budget: int = DEFAULT_RETRY_BUDGET, hedge: bool = False, time_budget: float | None = None, metadata: dict | None = None, **kw):
+    if use_async:
+        return run(get_async(data_type, mobile, desktop, retry_policy, retry_budget, hedge, time_budget, metadata, **kw))
+
+    logger.info(f"Request {data_type=} {mobile=} {desktop=} {retry_policy=} {retry_budget=} {hedge=} {time_budget=} {kw=}")
+
+    invocation = _new_invocation(data_type, retry_policy, retry_budget, hedge, time_budget)
+    try:
+        with invocation_context(invocation):
+            parser = _parse(invocation, mobile, desktop, **kw)
+    finally:
+        _finish(invocation, metadata)
+
+    return _data(parser)
+
+
+async def get_async(data_type: str, mobile: bool = True, desktop: bool = True, retry_policy: dict | None = None, retry_budget: int = DEFAULT_RETRY_BUDGET, hedge: bool = False, time_budget: float | None = None, metadata: dict | None = None, **kw):
+    logger.info(f"Request async {data_type=} {mobile=} {desktop=} {retry_policy=} {retry_budget=} {hedge=} {time_budget=} {kw=}")
+
+    invocation = _new_invocation(data_type, retry_policy, retry_budget, hedge, time_budget)
+    try:
+        with invocation_context(invocation):
+            parser = await _parse_async(invocation, mobile, desktop, **kw)
+    finally:
+        _finish(invocation, metadata)
+
+    return _data(parser)
+
+
+async def _get_batch_item(index: int, request: dict, metadata: dict | None) -> BatchResult:
+    request = {key: value for key, value in request.items() if key != "use_async"}
+    try:
+        return BatchResult(await get_async(metadata=metadata, **request), None)
+    except Exception as e:
+        # A failing item does not fail the batch
+        logger.warning(f"Batch item {index} {request.get('data_type')} failed with {type(e).__name__}: {e}", exc_info=True)
+        return BatchResult(None, e)
+
+
+async def get_batch_async(requests: list[dict], metadata: dict | None = None, **common) -> list[BatchResult]:
+    # Items run concurrently on one event loop, the transport limits concurrent requests per host
+    items_metadata = [{} if metadata is not None else None for _ in requests]
+    results = await asyncio.gather(*(
+        _get_batch_item(index, {**common, **request}, item_metadata)
+        for index, (request, item_metadata) in enumerate(zip(requests, items_metadata))
+    ))
+    if metadata is not None:
+        metadata["items"] = items_metadata
+    return list(results)
+
+
+def get_batch(requests: list[dict], metadata: dict | None = None, **common) -> list[BatchResult]:
+    logger.info(f"Request batch of {len(requests)} {common=}")
+    return run(get_batch_async(requests, metadata, **common))
@@ -4,9 +4,13 @@ import logging
 
 from datetime import date, datetime
 
-from ..constant import RequestMethod
+from curl_cffi.requests import Response
+
+from ..constant import RequestMethod, StockType
 from ..exception import WrongDataFormat
 from ..parser import DataParser
+from ..parser.fan_out import FanOutParser, fan_out_or_single
+from ..twse.stock import TwseStocksParser
 
 
 # https://www.cnyes.com/twstock/2330
@@ -39,9 +43,7 @@ class CnyesStockPriceHistoryParser(DataParser):
     def data(self):
         return self._data
 
-    def parse_response(self) -> None:
-        response = self.request()
-
+    def handle_response(self, response: Response) -> None:
         response.raise_for_status()
 
         try:
@@ -67,3 +69,38 @@ class CnyesStockPriceHistoryParser(DataParser):
             }
         except ValueError as e:
             raise WrongDataFormat(f"Error parsing response data for {response.url}. Got {json_data=}") from e
+
+
+class CnyesStocksPriceHistoryParser(FanOutParser):
+
+    def __init__(self, request_cloud_scraper_mobile: bool, request_cloud_scraper_desktop: bool, stock_ids: list[str] | str, start_date_included: str, end_date_excluded: str | None = None, max_concurrency: int | str | None = None) -> None:
+        super().__init__(
+            request_cloud_scraper_mobile=request_cloud_scraper_mobile,
+            request_cloud_scraper_desktop=request_cloud_scraper_desktop,
+            max_concurrency=max_concurrency,
+        )
+
+        if isinstance(stock_ids, str) and stock_ids != "all":
+            raise ValueError(f"Expect a list of stock ids or 'all'. Got {stock_ids=}")
+
+        self.stock_ids = stock_ids
+        self.start_date_included = start_date_included
+        self.end_date_excluded = end_date_excluded
+
+    async def keys_async(self) -> list[str]:
+        if self.stock_ids != "all":
+            return list(dict.fromkeys(self.stock_ids))
+
+        # Every listed stock, 上市 and 上櫃, a partial listing would silently drop a market
+        listing_parser = TwseStocksParser(self.request_cloud_scraper_mobile, self.request_cloud_scraper_desktop, [StockType.PUBLIC.value, StockType.OTC.value])
+        await listing_parser.parse_response_async()
+        listing = listing_parser.data
+        if listing["errors"]:
+            raise Exception(f"Unable to list stocks\n{listing['errors']}")
+        return [stock["id"] for stocks in listing["data"].values() for stock in stocks]
+
+    def create_parser(self, key: str) -> DataParser:
+        return CnyesStockPriceHistoryParser(self.request_cloud_scraper_mobile, self.request_cloud_scraper_desktop, key, self.start_date_included, self.end_date_excluded)
+
+
+parser = fan_out_or_single(CnyesStocksPriceHistoryParser, CnyesStockPriceHistoryParser, "stock_ids")
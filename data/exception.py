@@ -8,3 +8,19 @@ class WrongDataFormat(Exception):
 
 class BlockingByWebsiteError(Exception):
     pass
+
+
+class InvalidQuery(Exception):
+    pass
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class CircuitOpenError(Exception):
+
+    def __init__(self, host: str, retry_after: float) -> None:
+        super().__init__(f"Circuit open for {host}, retry after {retry_after:.0f}s")
+        self.host = host
+        self.retry_after = retry_after
@@ -3,6 +3,7 @@ import logging
 
 from ..constant import RequestMethod, ETF_Country
 from ..exception import WrongDataFormat
+from ..parser.fan_out import FanOutParser, fan_out_or_single
 from ..parser.html_parser import DataHTMLParser
 
 
@@ -13,6 +14,9 @@ logger = logging.getLogger(__name__)
 
 class MoneydjETFSliceParser(DataHTMLParser):
 
+    revalidate_attributes = ("_data", "_header_row")
+    stream_response = True
+
     def __init__(self, request_cloud_scraper_mobile: bool, request_cloud_scraper_desktop: bool, etf_id: str, etf_country: str) -> None:
         super().__init__(
             request_method=RequestMethod.GET,
@@ -46,11 +50,6 @@ class MoneydjETFSliceParser(DataHTMLParser):
             raise WrongDataFormat(msg)
         return self._data
     
-    def parse_response(self) -> None:
-        response = self.request()
-        # response.encoding = "big5"
-        self.feed(response.text)
-
     def handle_starttag(self, tag, attrs):
         if tag == "table" and (("id", "ctl00_ctl00_MainContent_MainContent_gvTbl") in attrs or ("id", "ctl00_ctl00_MainContent_MainContent_gvTbl_gvTbl") in attrs):
             self._entering_data_table = True
@@ -85,3 +84,26 @@ class MoneydjETFSliceParser(DataHTMLParser):
 
             if self._stack[-1] == "td":
                 self._cur_row.append(data.strip().replace('\xa0', ''))
+
+
+class MoneydjETFsSliceParser(FanOutParser):
+
+    def __init__(self, request_cloud_scraper_mobile: bool, request_cloud_scraper_desktop: bool, etf_ids: list[str] | dict[str, str], etf_country: str | None = None, max_concurrency: int | str | None = None) -> None:
+        super().__init__(
+            request_cloud_scraper_mobile=request_cloud_scraper_mobile,
+            request_cloud_scraper_desktop=request_cloud_scraper_desktop,
+            max_concurrency=max_concurrency,
+        )
+
+        # Ids of one country, or ids mapped to their own countries
+        etf_countries = etf_ids if isinstance(etf_ids, dict) else dict.fromkeys(etf_ids, etf_country)
+        self.etf_countries = {etf_id: ETF_Country(country) for etf_id, country in etf_countries.items()}
+
+    async def keys_async(self) -> list[str]:
+        return list(self.etf_countries)
+
+    def create_parser(self, key: str) -> MoneydjETFSliceParser:
+        return MoneydjETFSliceParser(self.request_cloud_scraper_mobile, self.request_cloud_scraper_desktop, key, self.etf_countries[key].value)
+
+
+parser = fan_out_or_single(MoneydjETFsSliceParser, MoneydjETFSliceParser, "etf_ids")
@@ -3,6 +3,8 @@ import logging
 
 from datetime import datetime
 
+from curl_cffi.requests import Response
+
 from ..model import Price
 from ..constant import RequestMethod
 from ..exception import WrongDataFormat
@@ -16,6 +18,8 @@ logger = logging.getLogger(__name__)
 
 class MoneydjTWIndex2YPriceParser(DataParser):
 
+    revalidate_attributes = ("_data",)
+
     def __init__(self, request_cloud_scraper_mobile: bool, request_cloud_scraper_desktop: bool) -> None:
         super().__init__(
             request_method=RequestMethod.GET,
@@ -33,9 +37,7 @@ class MoneydjTWIndex2YPriceParser(DataParser):
     def data(self):
         return self._data
 
-    def parse_response(self) -> None:
-        response = self.request()
-
+    def handle_response(self, response: Response) -> None:
         response.raise_for_status()
 
         response_text = response.text.strip("$")
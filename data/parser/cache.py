@@ -0,0 +1,70 @@
+import copy
+import json
+import logging
+import threading
+
+from collections import OrderedDict, namedtuple
+
+from curl_cffi import requests as curl_requests
+
+from ..constant import RequestMethod
+
+
+logger = logging.getLogger(__name__)
+
+
+CachedResponse = namedtuple("CachedResponse", [
+        "etag",
+        "last_modified",
+        "state",
+    ]
+)
+
+
+class ValidatorCache:
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(method: RequestMethod, url: str, request_kw: dict) -> str:
+        body = {name: request_kw[name] for name in ("data", "json") if name in request_kw}
+        return json.dumps([method.value, url, body], sort_keys=True, ensure_ascii=False, default=str)
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            if (entry := self._entries.get(key)) is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def store(self, key: str, response: curl_requests.Response, state: dict) -> None:
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag is None and last_modified is None:
+            return
+
+        entry = CachedResponse(etag, last_modified, copy.deepcopy(state))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def conditional_headers(entry: CachedResponse) -> dict:
+    headers = {}
+    if entry.etag is not None:
+        headers["If-None-Match"] = entry.etag
+    if entry.last_modified is not None:
+        headers["If-Modified-Since"] = entry.last_modified
+    return headers
+
+
+validator_cache = ValidatorCache()
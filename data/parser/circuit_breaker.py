@@ -0,0 +1,131 @@
+import contextlib
+import enum
+import logging
+import threading
+import time
+
+from typing import Iterator
+
+from curl_cffi import requests as curl_requests
+
+from .session import get_host
+from ..exception import BlockingByWebsiteError, CircuitOpenError, WebsiteMaintaince
+
+
+logger = logging.getLogger(__name__)
+
+
+# Errors meaning the host itself is down or blocking us, retrying other requests to it is pointless
+CIRCUIT_BREAKING_EXCEPTIONS = (BlockingByWebsiteError, WebsiteMaintaince)
+
+
+@enum.unique
+class CircuitState(enum.Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+
+    def __init__(self, host: str, failure_threshold: int = 3, cool_down: float = 300.0) -> None:
+        if failure_threshold < 1:
+            raise ValueError(f"Expect at least 1 failure to open the circuit. Got {failure_threshold=}")
+
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.cool_down = cool_down
+
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probe_started_at: float | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def _state(self, now: float) -> CircuitState:
+        if self._opened_at is None:
+            return CircuitState.CLOSED
+        if now - self._opened_at < self.cool_down:
+            return CircuitState.OPEN
+        return CircuitState.HALF_OPEN
+
+    def before_request(self) -> None:
+        # Fail fast while open, let a single probe through once the cool-down has passed
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(now)
+            if state is CircuitState.CLOSED:
+                return
+            if state is CircuitState.HALF_OPEN:
+                # A probe which never reported back does not keep the circuit half-open forever
+                if self._probe_started_at is None or now - self._probe_started_at >= self.cool_down:
+                    self._probe_started_at = now
+                    logger.info(f"Circuit half-open, probe {self.host}")
+                    return
+                retry_after = self._probe_started_at + self.cool_down - now
+            else:
+                retry_after = self._opened_at + self.cool_down - now
+        raise CircuitOpenError(self.host, retry_after)
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info(f"Circuit closed for {self.host}")
+            self._failures = 0
+            self._opened_at = None
+            self._probe_started_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(now)
+            self._failures += 1
+            if state is CircuitState.OPEN:
+                return
+            # A failed probe opens the circuit again right away
+            if state is CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+                logger.warning(f"Circuit open for {self.host} after {self._failures} failures, cool down {self.cool_down}s")
+                self._opened_at = now
+                self._probe_started_at = None
+
+
+_circuit_breakers: dict[str, CircuitBreaker] = {}
+_circuit_breakers_lock = threading.Lock()
+
+# host -> (failure_threshold, cool_down)
+_circuit_breaker_configs: dict[str, tuple[int, float]] = {}
+
+
+def configure_circuit_breaker(host: str, failure_threshold: int = 3, cool_down: float = 300.0) -> None:
+    with _circuit_breakers_lock:
+        _circuit_breaker_configs[host] = (failure_threshold, cool_down)
+        _circuit_breakers.pop(host, None)
+
+
+def get_circuit_breaker(host: str) -> CircuitBreaker:
+    with _circuit_breakers_lock:
+        breaker = _circuit_breakers.get(host)
+        if breaker is None:
+            breaker = _circuit_breakers[host] = CircuitBreaker(host, *_circuit_breaker_configs.get(host, ()))
+    return breaker
+
+
+def reset_circuit_breakers() -> None:
+    with _circuit_breakers_lock:
+        _circuit_breakers.clear()
+
+
+@contextlib.contextmanager
+def record_circuit(response: curl_requests.Response) -> Iterator[None]:
+    # Errors raised while handling a response count against the host which returned it
+    breaker = get_circuit_breaker(get_host(response.url))
+    try:
+        yield
+    except CIRCUIT_BREAKING_EXCEPTIONS:
+        breaker.record_failure()
+        raise
+    breaker.record_success()
@@ -0,0 +1,63 @@
+import asyncio
+import contextlib
+import logging
+import threading
+import weakref
+
+from ..exception import DeadlineExceeded
+
+
+logger = logging.getLogger(__name__)
+
+
+# In-flight async requests per host, on top of the rate limit which only spaces out their start
+DEFAULT_HOST_CONCURRENCY = 2
+
+DEFAULT_HOST_CONCURRENCY_LIMITS = {
+    # JSON API without rate limit, used for fan-out over every listed stock
+    "ws.api.cnyes.com": 8,
+}
+
+_host_concurrency: dict[str, int | None] = {}
+_host_concurrency_lock = threading.Lock()
+
+# asyncio.Semaphore is bound to the event loop it is first used on
+_semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]] = weakref.WeakKeyDictionary()
+
+
+def configure_concurrency(host: str, limit: int | None) -> None:
+    if limit is not None and limit < 1:
+        raise ValueError(f"Expect at least 1 concurrent request. Got {limit=}")
+    with _host_concurrency_lock:
+        _host_concurrency[host] = limit
+    for semaphores in list(_semaphores.values()):
+        semaphores.pop(host, None)
+
+
+def get_concurrency(host: str) -> int | None:
+    with _host_concurrency_lock:
+        if host in _host_concurrency:
+            return _host_concurrency[host]
+    return DEFAULT_HOST_CONCURRENCY_LIMITS.get(host, DEFAULT_HOST_CONCURRENCY)
+
+
+@contextlib.asynccontextmanager
+async def host_slot(host: str, max_wait: float | None = None):
+    if (limit := get_concurrency(host)) is None:
+        yield
+        return
+
+    semaphores = _semaphores.setdefault(asyncio.get_running_loop(), {})
+    if (semaphore := semaphores.get(host)) is None:
+        semaphore = semaphores[host] = asyncio.Semaphore(limit)
+    if semaphore.locked():
+        logger.info(f"Wait for one of {limit} concurrent requests to {host}")
+    try:
+        async with asyncio.timeout(max_wait):
+            await semaphore.acquire()
+    except TimeoutError:
+        raise DeadlineExceeded(f"No free slot of {limit} concurrent requests to {host} within {max_wait:.2f}s") from None
+    try:
+        yield
+    finally:
+        semaphore.release()
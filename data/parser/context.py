@@ -0,0 +1,74 @@
+import contextlib
+import contextvars
+import time
+
+from .retry import RetryBudget, RetryPolicy, get_retry_policy
+from .timing import RequestTiming
+from ..exception import DeadlineExceeded
+
+
+DEFAULT_RETRY_BUDGET = 10
+
+
+class Invocation:
+
+    def __init__(self, data_type: str | None = None, retry_policy: RetryPolicy | None = None, retry_budget: int = DEFAULT_RETRY_BUDGET, hedge: bool = False, time_budget: float | None = None) -> None:
+        self.data_type = data_type
+        self.retry_policy = retry_policy
+        self.retry_budget = RetryBudget(retry_budget)
+        self.hedge = hedge
+        self.deadline = time.monotonic() + float(time_budget) if time_budget is not None else None
+
+        self.last_host: str | None = None
+        # Every request made for this invocation, including blocked and retried ones
+        self.timings: list[RequestTiming] = []
+
+    def get_retry_policy(self, host: str | None = None) -> RetryPolicy:
+        if self.retry_policy is not None:
+            return self.retry_policy
+        return get_retry_policy(self.data_type, host)
+
+    def remaining(self) -> float | None:
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+    def within_deadline(self, seconds: float = 0) -> bool:
+        remaining = self.remaining()
+        return remaining is None or remaining > seconds
+
+    def check_deadline(self, seconds: float = 0) -> None:
+        if not self.within_deadline(seconds):
+            raise DeadlineExceeded(f"No time left for {self.data_type}, {self.remaining():.2f}s left and {seconds}s needed")
+
+    def clamp_timeout(self, timeout: float | str | tuple | None) -> float | tuple | None:
+        # A hop never waits longer than what is left of the invocation
+        if (remaining := self.remaining()) is None:
+            return timeout
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            # Connect and read follow each other, together they fit in what is left
+            scale = min(1.0, remaining / sum(float(value) for value in timeout))
+            return tuple(float(value) * scale for value in timeout)
+        return min(float(timeout), remaining)
+
+
+_current_invocation: contextvars.ContextVar[Invocation | None] = contextvars.ContextVar("invocation", default=None)
+
+
+def current_invocation() -> Invocation:
+    invocation = _current_invocation.get()
+    if invocation is None:
+        # Parsers used without data.get, e.g. directly in tests
+        return Invocation()
+    return invocation
+
+
+@contextlib.contextmanager
+def invocation_context(invocation: Invocation):
+    token = _current_invocation.set(invocation)
+    try:
+        yield invocation
+    finally:
+        _current_invocation.reset(token)
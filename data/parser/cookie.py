@@ -0,0 +1,128 @@
+import json
+import logging
+import os
+import threading
+import time
+
+from collections import namedtuple
+from typing import Callable
+
+from curl_cffi import requests as curl_requests
+
+from .identity import Identity
+
+
+logger = logging.getLogger(__name__)
+
+
+StoredCookie = namedtuple("StoredCookie", [
+        "name",
+        "value",
+        "domain",
+        "path",
+        "expires",
+    ]
+)
+
+
+# Cookies without expiry, e.g. Cloudflare __cf_bm, are kept for this long
+SESSION_COOKIE_TTL = 30 * 60
+
+
+def jar_key(host: str, identity: Identity) -> str:
+    # Clearance cookies are bound to the user agent and TLS fingerprint which earned them, one jar per identity of a host
+    return "_".join([host, identity.impersonate, identity.platform, "mobile" if identity.mobile else "desktop"])
+
+
+class CookieStore:
+
+    def __init__(self, directory: str | None = None) -> None:
+        self.directory = directory
+
+        self._cookies: dict[str, dict[str, StoredCookie]] = {}
+        # The user agent sent with the cookies of a jar
+        self._user_agents: dict[str, str | None] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, jar: str) -> str:
+        return os.path.join(self.directory, f"{jar.replace(':', '_')}.json")
+
+    def _read(self, jar: str) -> tuple[str | None, dict[str, StoredCookie]]:
+        if self.directory is None:
+            return None, {}
+        try:
+            with open(self._path(jar), "r") as fp:
+                stored = json.load(fp)
+            return stored["user_agent"], {cookie[0]: StoredCookie(*cookie) for cookie in stored["cookies"]}
+        except FileNotFoundError:
+            return None, {}
+        except (OSError, ValueError, TypeError, KeyError):
+            logger.warning(f"Unable to read cookies of {jar}", exc_info=True)
+            return None, {}
+
+    def _write(self, jar: str) -> None:
+        if self.directory is None:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{self._path(jar)}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as fp:
+                json.dump({"user_agent": self._user_agents[jar], "cookies": list(self._cookies[jar].values())}, fp)
+            os.replace(tmp_path, self._path(jar))
+        except OSError:
+            logger.warning(f"Unable to write cookies of {jar}", exc_info=True)
+
+    def _jar_cookies(self, jar: str) -> dict[str, StoredCookie]:
+        if jar not in self._cookies:
+            self._user_agents[jar], self._cookies[jar] = self._read(jar)
+        return self._cookies[jar]
+
+    def user_agent(self, jar: str, choose: Callable[[], str]) -> str:
+        # Chosen once, the cookies of the jar are always replayed with the same user agent
+        with self._lock:
+            self._jar_cookies(jar)
+            if (user_agent := self._user_agents[jar]) is None:
+                user_agent = self._user_agents[jar] = choose()
+                logger.info(f"User agent of {jar} is {user_agent}")
+            return user_agent
+
+    def load(self, jar: str) -> dict[str, str]:
+        now = time.time()
+        with self._lock:
+            cookies = self._jar_cookies(jar)
+            for name in [name for name, cookie in cookies.items() if cookie.expires <= now]:
+                logger.info(f"Cookie {name} of {jar} expired")
+                cookies.pop(name)
+            return {name: cookie.value for name, cookie in cookies.items()}
+
+    def save(self, jar: str, response: curl_requests.Response) -> None:
+        received = [
+            StoredCookie(
+                name=cookie.name,
+                value=cookie.value,
+                domain=cookie.domain,
+                path=cookie.path,
+                expires=cookie.expires if cookie.expires is not None else time.time() + SESSION_COOKIE_TTL,
+            )
+            for cookie in response.cookies.jar
+        ]
+        if not received:
+            return
+
+        with self._lock:
+            cookies = self._jar_cookies(jar)
+            changed = False
+            for cookie in received:
+                if (stored := cookies.get(cookie.name)) is None or stored.value != cookie.value:
+                    changed = True
+                cookies[cookie.name] = cookie
+            if changed:
+                self._write(jar)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cookies.clear()
+            self._user_agents.clear()
+
+
+cookie_store = CookieStore(os.environ.get("COOKIE_STORE_DIR"))
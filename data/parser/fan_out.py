@@ -0,0 +1,96 @@
+import asyncio
+import logging
+
+from typing import Hashable
+
+from .loop import run
+from .parser import DataParser
+from ..constant import RequestMethod
+
+
+logger = logging.getLogger(__name__)
+
+
+# Sub-parsers in flight at once, the transport further limits concurrent requests per host
+DEFAULT_MAX_CONCURRENCY = 8
+
+
+class FanOutParser(DataParser):
+
+    def __init__(self, request_cloud_scraper_mobile: bool, request_cloud_scraper_desktop: bool, max_concurrency: int | str | None = None) -> None:
+        super().__init__(
+            request_method=RequestMethod.GET,
+            request_cloud_scraper_mobile=request_cloud_scraper_mobile,
+            request_cloud_scraper_desktop=request_cloud_scraper_desktop,
+        )
+
+        self.max_concurrency = int(max_concurrency) if max_concurrency else DEFAULT_MAX_CONCURRENCY
+        if self.max_concurrency < 1:
+            raise ValueError(f"Expect at least 1 concurrent parser. Got {max_concurrency=}")
+
+        self._data: dict = {}
+        self._errors: dict = {}
+
+    async def keys_async(self) -> list[Hashable]:
+        raise NotImplementedError
+
+    def create_parser(self, key: Hashable) -> DataParser:
+        raise NotImplementedError
+
+    def get_key_data(self, key: Hashable, parser: DataParser):
+        return parser.data
+
+    async def parse_key_async(self, key: Hashable):
+        # None leaves the key out of the result without an error, e.g. no data for a holiday
+        parser = self.create_parser(key)
+        await parser.parse_response_async()
+        return self.get_key_data(key, parser)
+
+    @property
+    def data(self) -> dict:
+        return {
+            "data": self._data,
+            "errors": self._errors,
+        }
+
+    def _record_error(self, key: Hashable, e: Exception) -> None:
+        # One failing key does not fail the others
+        logger.warning(f"Failed {key=} with {type(e).__name__}: {e}")
+        self._errors[key] = {
+            "exception_type": str(type(e)),
+            "exception_message": str(e),
+        }
+
+    def _keep_key_order(self, keys: list[Hashable]) -> None:
+        # Keep the order of the keys rather than the completion order
+        self._data = {key: self._data[key] for key in keys if key in self._data}
+        self._errors = {key: self._errors[key] for key in keys if key in self._errors}
+
+    async def _parse_key(self, semaphore: asyncio.Semaphore, key: Hashable) -> None:
+        async with semaphore:
+            try:
+                if (data := await self.parse_key_async(key)) is not None:
+                    self._data[key] = data
+            except Exception as e:
+                self._record_error(key, e)
+
+    def parse_response(self) -> None:
+        run(self.parse_response_async())
+
+    async def parse_response_async(self) -> None:
+        keys = await self.keys_async()
+        logger.info(f"Fan out to {len(keys)} keys with {self.max_concurrency=}")
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        await asyncio.gather(*(self._parse_key(semaphore, key) for key in keys))
+        self._keep_key_order(keys)
+
+
+def fan_out_or_single(fan_out_parser: type[FanOutParser], single_parser: type[DataParser], keyword: str):
+    # The parser of a data type, fanning out when the keyword of the fan-out parser is given, e.g. start_year or etf_ids
+    def parser(*args, **kw) -> DataParser:
+        if kw.get(keyword) is None:
+            kw.pop(keyword, None)
+            return single_parser(*args, **kw)
+        return fan_out_parser(*args, **kw)
+    return parser
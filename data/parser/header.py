@@ -0,0 +1,127 @@
+import importlib.util
+import json
+import logging
+import os
+import random
+import re
+
+
+logger = logging.getLogger(__name__)
+
+
+DESKTOP_PLATFORMS = ("linux", "windows", "darwin")
+MOBILE_PLATFORMS = ("android", "ios")
+
+
+# Used when cloudscraper (and its browser database) is not installed
+_FALLBACK_USER_AGENTS = {
+    "desktop": {
+        "windows": {
+            "chrome": [
+                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36",
+                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
+            ],
+            "firefox": [
+                "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:135.0) Gecko/20100101 Firefox/135.0",
+            ],
+        },
+        "linux": {
+            "chrome": [
+                "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36",
+            ],
+            "firefox": [
+                "Mozilla/5.0 (X11; Linux x86_64; rv:135.0) Gecko/20100101 Firefox/135.0",
+            ],
+        },
+        "darwin": {
+            "chrome": [
+                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36",
+            ],
+            "firefox": [
+                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:135.0) Gecko/20100101 Firefox/135.0",
+            ],
+        },
+    },
+    "mobile": {
+        "android": {
+            "chrome": [
+                "Mozilla/5.0 (Linux; Android 10; K) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Mobile Safari/537.36",
+            ],
+        },
+        "ios": {
+            "chrome": [
+                "Mozilla/5.0 (iPhone; CPU iPhone OS 18_4 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) CriOS/136.0.0.0 Mobile/15E148 Safari/604.1",
+            ],
+        },
+    },
+}
+
+
+def _load_user_agents() -> dict:
+    # Only locate the browser database shipped with cloudscraper, importing it would pull in requests and friends
+    spec = importlib.util.find_spec("cloudscraper")
+    if spec is not None and spec.submodule_search_locations:
+        path = os.path.join(spec.submodule_search_locations[0], "user_agent", "browsers.json")
+        try:
+            with open(path, "r") as fp:
+                return json.load(fp)["user_agents"]
+        except (OSError, ValueError, KeyError):
+            logger.warning(f"Unable to load browser database {path}", exc_info=True)
+    return _FALLBACK_USER_AGENTS
+
+
+class HeaderProfilePool:
+
+    def __init__(self, user_agents: dict | None = None) -> None:
+        user_agents = _load_user_agents() if user_agents is None else user_agents
+
+        self._random = random.SystemRandom()
+
+        # platform -> browser -> user agents, plus flattened tuples so picking is O(1)
+        self._by_browser: dict[str, dict[str, tuple[str, ...]]] = {}
+        self._by_platform: dict[str, tuple[str, ...]] = {}
+        for device_type in ("desktop", "mobile"):
+            for platform, browsers in user_agents.get(device_type, {}).items():
+                by_browser = {browser: tuple(agents) for browser, agents in browsers.items() if agents}
+                if by_browser:
+                    self._by_browser[platform] = by_browser
+                    self._by_platform[platform] = tuple(agent for agents in by_browser.values() for agent in agents)
+
+        self._desktop_platforms = tuple(platform for platform in DESKTOP_PLATFORMS if platform in self._by_platform)
+        self._mobile_platforms = tuple(platform for platform in MOBILE_PLATFORMS if platform in self._by_platform)
+        if not self._desktop_platforms or not self._mobile_platforms:
+            raise ValueError("User agent pool should have both desktop and mobile platforms")
+
+    def platforms(self, mobile: bool = True, desktop: bool = True) -> tuple[str, ...]:
+        if not mobile and not desktop:
+            raise ValueError("Mobile and desktop cannot be both disabled")
+        if not mobile:
+            return self._desktop_platforms
+        if not desktop:
+            return self._mobile_platforms
+        return self._desktop_platforms + self._mobile_platforms
+
+    def user_agent(self, mobile: bool = True, desktop: bool = True, platform: str | None = None, browser: str | None = None, version: str | None = None) -> str:
+        if platform is None:
+            platforms = self.platforms(mobile, desktop)
+            if browser is not None:
+                platforms = tuple(platform for platform in platforms if browser in self._by_browser[platform])
+            platform = self._random.choice(platforms)
+        if browser is None:
+            return self._random.choice(self._by_platform[platform])
+        agents = self._by_browser[platform][browser]
+        # The major version of the impersonated fingerprint when the pool has it
+        if version is not None:
+            agents = tuple(agent for agent in agents if f"/{version}." in agent) or agents
+        return self._random.choice(agents)
+
+
+def impersonated_browser(impersonate: str) -> tuple[str, str | None]:
+    # Browser and major version of a curl_cffi fingerprint, e.g. chrome110 or chrome_android. Edge is Chromium, sent as Chrome.
+    if (m := re.match(r"^(chrome|edge|firefox|safari)\D*(\d+)?", impersonate)) is None:
+        raise ValueError(f"Unknown browser of {impersonate=}")
+    browser, version = m.groups()
+    return "chrome" if browser == "edge" else browser, version
+
+
+header_profiles = HeaderProfilePool()
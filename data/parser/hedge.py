@@ -0,0 +1,44 @@
+import logging
+import threading
+
+from .latency import latency_tracker
+
+
+logger = logging.getLogger(__name__)
+
+
+class HedgePolicy:
+
+    def __init__(self, percentile: float = 0.9, min_delay: float = 0.5, default_delay: float = 10.0) -> None:
+        if not 0 < percentile <= 1:
+            raise ValueError(f"Percentile should be in (0, 1]. Got {percentile=}")
+
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.default_delay = default_delay
+
+    def delay(self, host: str) -> float:
+        # Start the hedge once the first attempt is slower than most of the previous ones for this host
+        latency = latency_tracker.percentile(host, self.percentile)
+        if latency is None:
+            return self.default_delay
+        return max(self.min_delay, latency)
+
+
+DEFAULT_HEDGE_POLICY = HedgePolicy()
+
+_hedge_policies: dict[str, HedgePolicy | None] = {}
+_hedge_policies_lock = threading.Lock()
+
+
+def configure_hedging(host: str, policy: HedgePolicy | None = DEFAULT_HEDGE_POLICY) -> None:
+    with _hedge_policies_lock:
+        _hedge_policies[host] = policy
+
+
+def get_hedge_policy(host: str, enabled: bool = False) -> HedgePolicy | None:
+    # Explicitly configured hosts first, then the default policy when hedging is enabled for the whole invocation
+    with _hedge_policies_lock:
+        if host in _hedge_policies:
+            return _hedge_policies[host]
+    return DEFAULT_HEDGE_POLICY if enabled else None
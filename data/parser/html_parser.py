@@ -1,15 +1,68 @@
+import codecs
+import logging
+
 from html.parser import HTMLParser
 
+from curl_cffi.requests import Response
+
 from . import DataParser
 
 
+logger = logging.getLogger(__name__)
+
+
 class DataHTMLParser(DataParser, HTMLParser):
+
+    # Charset of the body when the server does not declare it, e.g. big5 pages of MOPS
+    response_encoding: str | None = None
+
+    # Characters of the fed text kept for error messages, rawdata is consumed while parsing
+    raw_tail_size = 2000
     
     def __init__(self, **kw):
         DataParser.__init__(self, **kw)
         HTMLParser.__init__(self)
 
         self._stack = []
+        self._decoder: codecs.IncrementalDecoder | None = None
+        self._pending = ""
+        self.raw_tail = ""
+
+    def feed(self, data: str) -> None:
+        self.raw_tail = (self.raw_tail + data)[-self.raw_tail_size:]
+        super().feed(data)
+
+    def handle_response(self, response: Response) -> None:
+        if self.response_encoding is not None:
+            response.encoding = self.response_encoding
+        self.feed(response.text)
+
+    def handle_response_chunk(self, response: Response, chunk: bytes) -> None:
+        if self._decoder is None:
+            encoding = self.response_encoding or response.encoding
+            try:
+                decoder_class = codecs.getincrementaldecoder(encoding)
+            except LookupError:
+                logger.warning(f"Unknown {encoding=} for {response.url}, decode as utf-8")
+                decoder_class = codecs.getincrementaldecoder("utf-8")
+            # Keeps the incomplete multi-byte character at the end of a chunk for the next one
+            self._decoder = decoder_class(errors="replace")
+        # HTMLParser reports the text at the end of the fed data right away, so a text split
+        # across chunks would reach handle_data in pieces. Feed up to the last tag only.
+        text = self._pending + self._decoder.decode(chunk)
+        cut = text.rfind("<")
+        if cut <= 0:
+            self._pending = text
+            return
+        self._pending = text[cut:]
+        self.feed(text[:cut])
+
+    def handle_response_end(self, response: Response) -> None:
+        if self._decoder is not None:
+            self.feed(self._pending + self._decoder.decode(b"", final=True))
+            self._pending = ""
+        # Flush and release the buffered rawdata
+        self.close()
 
     def is_in_tag(self, tag):
         return self._stack and self._stack[-1] == tag
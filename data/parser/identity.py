@@ -0,0 +1,107 @@
+import logging
+import random
+import threading
+
+from collections import namedtuple
+
+from .header import DESKTOP_PLATFORMS, MOBILE_PLATFORMS
+
+
+logger = logging.getLogger(__name__)
+
+
+Identity = namedtuple("Identity", [
+        "impersonate",
+        "platform",
+        "mobile",
+    ]
+)
+
+
+DESKTOP_IMPERSONATES = ("chrome", "chrome110", "edge")
+MOBILE_IMPERSONATES = ("chrome", "chrome_android")
+
+
+class IdentityStats:
+
+    # Weight of the latest latency sample in the moving average
+    LATENCY_ALPHA = 0.3
+
+    def __init__(self) -> None:
+        self.attempts = 0
+        self.successes = 0
+        self.latency: float | None = None
+
+    def record(self, success: bool, latency: float | None = None) -> None:
+        self.attempts += 1
+        if success:
+            self.successes += 1
+        if latency is not None:
+            self.latency = latency if self.latency is None else self.LATENCY_ALPHA * latency + (1 - self.LATENCY_ALPHA) * self.latency
+
+    def score(self, prior: float, best_latency: float | None, unknown_latency_factor: float) -> float:
+        # Smoothed success rate so that a single failure does not ban an identity forever
+        success_rate = (self.successes + 2 * prior) / (self.attempts + 2)
+        if not self.latency or best_latency is None:
+            return success_rate * unknown_latency_factor
+        # Latency relative to the fastest identity of the host, a slow host does not penalize the identities working for it
+        return success_rate * best_latency / max(self.latency, best_latency)
+
+
+class IdentityManager:
+
+    DEFAULT_PRIOR = 0.5
+    HINT_PRIOR = 0.75
+
+    def __init__(self) -> None:
+        self._stats: dict[tuple[str, Identity], IdentityStats] = {}
+        self._lock = threading.Lock()
+        self._random = random.SystemRandom()
+
+    @staticmethod
+    def identities(mobile: bool = True, desktop: bool = True) -> list[Identity]:
+        if not mobile and not desktop:
+            raise ValueError("Mobile and desktop cannot be both disabled")
+
+        identities = []
+        if desktop:
+            identities.extend(Identity(impersonate, platform, False) for impersonate in DESKTOP_IMPERSONATES for platform in DESKTOP_PLATFORMS)
+        if mobile:
+            identities.extend(Identity(impersonate, platform, True) for impersonate in MOBILE_IMPERSONATES for platform in MOBILE_PLATFORMS)
+        return identities
+
+    def candidates(self, host: str, mobile: bool = True, desktop: bool = True, hint: str | None = None) -> list[Identity]:
+        identities = self.identities(mobile, desktop)
+        if hint is not None and all(identity.impersonate != hint for identity in identities):
+            identities.extend(Identity(hint, platform, False) for platform in DESKTOP_PLATFORMS if desktop)
+            identities.extend(Identity(hint, platform, True) for platform in MOBILE_PLATFORMS if mobile and not desktop)
+
+        def _score(identity: Identity, best_latency: float | None, unknown_latency_factor: float) -> float:
+            prior = self.HINT_PRIOR if identity.impersonate == hint else self.DEFAULT_PRIOR
+            stats = self._stats.get((host, identity))
+            return prior * unknown_latency_factor if stats is None else stats.score(prior, best_latency, unknown_latency_factor)
+
+        with self._lock:
+            latencies = [stats.latency for (the_host, _), stats in self._stats.items() if the_host == host and stats.latency]
+            best_latency = min(latencies, default=None)
+            # Identities without a latency are taken as slow as the slowest one, so a working identity never ranks below an unknown one
+            unknown_latency_factor = best_latency / max(latencies) if latencies else 1.0
+            scores = {identity: _score(identity, best_latency, unknown_latency_factor) for identity in identities}
+
+        # Shuffle first so identities with the same score are picked at random
+        self._random.shuffle(identities)
+        identities.sort(key=scores.__getitem__, reverse=True)
+        return identities
+
+    def record(self, host: str, identity: Identity, success: bool, latency: float | None = None) -> None:
+        with self._lock:
+            stats = self._stats.setdefault((host, identity), IdentityStats())
+            stats.record(success, latency)
+        logger.debug(f"Identity {identity} for {host=} {success=} {latency=} now {stats.successes}/{stats.attempts}")
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+identity_manager = IdentityManager()
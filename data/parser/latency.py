@@ -0,0 +1,76 @@
+import json
+import logging
+import math
+import os
+import threading
+
+from collections import deque
+
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyTracker:
+
+    def __init__(self, window: int = 100, min_samples: int = 5, path: str | None = None) -> None:
+        self.window = window
+        self.min_samples = min_samples
+        self.path = path
+
+        self._samples: dict[str, deque[float]] = {}
+        self._changed = False
+        self._lock = threading.Lock()
+
+        self._read()
+
+    def _read(self) -> None:
+        if self.path is None:
+            return
+        try:
+            with open(self.path, "r") as fp:
+                samples = json.load(fp)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError):
+            logger.warning(f"Unable to read latencies from {self.path}", exc_info=True)
+            return
+        self._samples = {key: deque(map(float, values), maxlen=self.window) for key, values in samples.items()}
+
+    def save(self) -> None:
+        # Only persisted when a path is configured, e.g. on /tmp to survive a process restart
+        if self.path is None:
+            return
+        with self._lock:
+            if not self._changed:
+                return
+            samples = {key: list(values) for key, values in self._samples.items()}
+            self._changed = False
+        try:
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as fp:
+                json.dump(samples, fp)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            logger.warning(f"Unable to write latencies to {self.path}", exc_info=True)
+
+    def record(self, key: str, seconds: float) -> None:
+        with self._lock:
+            if key not in self._samples:
+                self._samples[key] = deque(maxlen=self.window)
+            self._samples[key].append(seconds)
+            self._changed = True
+
+    def percentile(self, key: str, q: float) -> float | None:
+        # Nearest-rank percentile of the rolling window, None until there are enough samples
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[max(0, math.ceil(q * len(samples)) - 1)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+
+latency_tracker = LatencyTracker(path=os.environ.get("LATENCY_STORE_PATH"))
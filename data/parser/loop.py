@@ -0,0 +1,22 @@
+import asyncio
+import threading
+
+from typing import Awaitable, TypeVar
+
+
+T = TypeVar("T")
+
+
+# One loop per thread, kept across warm invocations so async sessions and their connections survive
+_local = threading.local()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    loop = getattr(_local, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = _local.loop = asyncio.new_event_loop()
+    return loop
+
+
+def run(awaitable: Awaitable[T]) -> T:
+    return get_event_loop().run_until_complete(awaitable)
@@ -1,12 +1,28 @@
+import asyncio
+import copy
+import itertools
 import logging
-import random
 import time
 
 from typing import Sequence
 
-from cloudscraper import CloudScraper
 from curl_cffi import requests as curl_requests
 
+from . import rate_limit
+from .cache import CachedResponse, conditional_headers, validator_cache
+from .circuit_breaker import get_circuit_breaker, record_circuit
+from .concurrency import host_slot
+from .context import current_invocation
+from .cookie import cookie_store, jar_key
+from .header import header_profiles, impersonated_browser
+from .hedge import get_hedge_policy
+from .identity import Identity, identity_manager
+from .latency import latency_tracker
+from .loop import run
+from .session import get_host, get_session, discard_session, get_async_session, discard_async_session
+from .timeout import get_endpoint, request_timeout
+from .timing import RequestTiming, request_timing
+from .transfer import transfer_counter
 from ..constant import RequestMethod
 
 
@@ -15,6 +31,13 @@ logger = logging.getLogger(__name__)
 
 class DataParser:
 
+    # Attributes holding the parsed result. When set, responses are revalidated with
+    # If-None-Match/If-Modified-Since and these attributes are restored on 304 Not Modified.
+    revalidate_attributes: tuple[str, ...] = ()
+
+    # Parse the body while it downloads, chunks go to handle_response_chunk instead of handle_response
+    stream_response: bool = False
+
     def __init__(self, 
         request_method: RequestMethod,
         request_cloud_scraper_mobile: bool, 
@@ -27,6 +50,11 @@ class DataParser:
 
         self.expected_status_codes = expected_status_codes
 
+        self._cache_key: str | None = None
+        self._cached_response: CachedResponse | None = None
+
+        self.timings: list[RequestTiming] = []
+
     @property
     def request_url(self) -> str:
         raise NotImplementedError
@@ -43,56 +71,226 @@ class DataParser:
     def data(self):
         raise NotImplementedError
     
-    def request(self) -> curl_requests.Response:
-        request_method = self.request_method
-        request_url = self.request_url
-        request_kw = self.request_kw
-        request_cloud_scraper_mobile = self.request_cloud_scraper_mobile
-        request_cloud_scraper_desktop = self.request_cloud_scraper_desktop
-        expected_status_codes = self.expected_status_codes
-
+    def _request_args(self) -> tuple[tuple, dict]:
         if self.request_method not in RequestMethod:
             raise ValueError(f"Unsupported method {self.request_method=}")
-        
-        response = request(
-            request_url, 
-            request_method, 
-            request_cloud_scraper_mobile, 
-            request_cloud_scraper_desktop, 
-            **request_kw,
+
+        args = (
+            self.request_url, 
+            self.request_method, 
+            self.request_cloud_scraper_mobile, 
+            self.request_cloud_scraper_desktop, 
         )
-        if response.status_code not in expected_status_codes:
+        request_kw = self.request_kw
+        if self.stream_response:
+            request_kw = {**request_kw, "stream": True}
+
+        if self.revalidate_attributes:
+            self._cache_key = validator_cache.key(self.request_method, args[0], request_kw)
+            if (cached_response := validator_cache.get(self._cache_key)) is not None:
+                request_kw = {**request_kw, "headers": {**request_kw.get("headers", {}), **conditional_headers(cached_response)}}
+            self._cached_response = cached_response
+        return args, request_kw
+
+    def _check_response(self, response: curl_requests.Response) -> curl_requests.Response:
+        if response.status_code == 304 and self._cached_response is not None:
+            return response
+        if response.status_code not in self.expected_status_codes:
             raise curl_requests.exceptions.HTTPError(f"Unexpected status code: {response.status_code}\n{response.text}")
         return response
 
-    def parse_response(self) -> None:
+    def request(self) -> curl_requests.Response:
+        args, request_kw = self._request_args()
+        response = request(*args, **request_kw)
+        if not is_streamed(response):
+            self.timings.append(request_timing(response))
+        return self._check_response(response)
+
+    async def request_async(self) -> curl_requests.Response:
+        args, request_kw = self._request_args()
+        response = await request_async(*args, **request_kw)
+        if not is_streamed(response):
+            self.timings.append(request_timing(response))
+        return self._check_response(response)
+
+    async def download_async(self) -> curl_requests.Response:
+        # The whole body even for a streaming parser, handle_download parses it later, e.g. in a worker thread
+        args, request_kw = self._request_args()
+        response = await request_async(*args, **{**request_kw, "stream": False})
+        self.timings.append(request_timing(response))
+        return self._check_response(response)
+
+    def handle_download(self, response: curl_requests.Response) -> None:
+        self._handle_or_revalidate(response)
+
+    def handle_response(self, response: curl_requests.Response) -> None:
         raise NotImplementedError
 
+    def handle_response_chunk(self, response: curl_requests.Response, chunk: bytes) -> None:
+        raise NotImplementedError
 
-def request(url: str, method: RequestMethod, mobile: bool = True, desktop: bool = True, **request_kw):
-    response = None
-    exception = None
-    
+    def handle_response_end(self, response: curl_requests.Response) -> None:
+        pass
+
+    def _revalidated(self, response: curl_requests.Response) -> bool:
+        if response.status_code == 304 and self._cached_response is not None:
+            logger.info(f"Not modified, reuse parsed result for {response.url}")
+            for name, value in copy.deepcopy(self._cached_response.state).items():
+                setattr(self, name, value)
+            return True
+        return False
+
+    def _store_validators(self, response: curl_requests.Response) -> None:
+        if self.revalidate_attributes:
+            validator_cache.store(self._cache_key, response, {name: getattr(self, name) for name in self.revalidate_attributes})
+
+    def _handle_or_revalidate(self, response: curl_requests.Response) -> None:
+        if self._revalidated(response):
+            return
+
+        with record_circuit(response):
+            if is_streamed(response):
+                size = 0
+                started = time.monotonic()
+                timeout = _stream_timeout(response.url, self.request_kw.get("timeout"))
+                try:
+                    for chunk in response.iter_content():
+                        _check_stream(response, started, timeout)
+                        size += len(chunk)
+                        self.handle_response_chunk(response, chunk)
+                finally:
+                    response.close()
+                self.timings.append(_record_transfer(response, size, time.monotonic() - started))
+                self.handle_response_end(response)
+            else:
+                self.handle_response(response)
+
+        self._store_validators(response)
+
+    async def _handle_or_revalidate_async(self, response: curl_requests.Response) -> None:
+        if self._revalidated(response):
+            return
+
+        with record_circuit(response):
+            if is_streamed(response):
+                size = 0
+                started = time.monotonic()
+                timeout = _stream_timeout(response.url, self.request_kw.get("timeout"))
+                try:
+                    async for chunk in response.aiter_content():
+                        _check_stream(response, started, timeout)
+                        size += len(chunk)
+                        self.handle_response_chunk(response, chunk)
+                finally:
+                    await response.aclose()
+                self.timings.append(_record_transfer(response, size, time.monotonic() - started))
+                self.handle_response_end(response)
+            else:
+                self.handle_response(response)
+
+        self._store_validators(response)
+
+    def parse_response(self) -> None:
+        self._handle_or_revalidate(self.request())
+
+    async def parse_response_async(self) -> None:
+        await self._handle_or_revalidate_async(await self.request_async())
+
+
+def is_streamed(response: curl_requests.Response) -> bool:
+    # Only successful responses are left streaming, the transport reads the others in full
+    return response.queue is not None and response.status_code == 200
+
+
+def _total_timeout(timeout: float | str | tuple | None) -> float | None:
+    # A (connect, read) tuple bounds the whole transfer by its sum, as curl does
+    if timeout is None:
+        return None
+    if isinstance(timeout, tuple):
+        return sum(map(float, timeout))
+    return float(timeout)
+
+
+def _stream_timeout(url: str, timeout: float | str | tuple | None) -> float | None:
+    # Seconds the whole body may take. For a stream curl only bounds the connection and the transfer speed.
+    return _total_timeout(request_timeout(url, timeout))
+
+
+def _record_timeout(url: str, timeout: float | str | tuple | None) -> None:
+    # At least as slow as the timeout. Sampling answered requests only, the learned timeout could never widen.
+    if not current_invocation().within_deadline():
+        return # Cut short by the deadline, not by the endpoint
+    if (seconds := _total_timeout(timeout)) is not None:
+        latency_tracker.record(get_endpoint(url), seconds)
+
+
+def _check_stream(response: curl_requests.Response, started: float, timeout: float | None) -> None:
+    # A trickling body would otherwise keep the hop, and the invocation, waiting past their timeouts
+    current_invocation().check_deadline()
+    if timeout is not None and (elapsed := time.monotonic() - started) > timeout:
+        _record_timeout(response.url, timeout)
+        raise curl_requests.exceptions.Timeout(f"Streaming {response.url} took {elapsed:.2f}s, more than {timeout:.2f}s")
+
+
+# Worst case round trips for a blocked host, the former random -> desktop -> mobile chain
+MAX_IDENTITY_ATTEMPTS = 3
+
+
+async def _close_response(response: curl_requests.Response) -> None:
+    if is_streamed(response):
+        await response.aclose()
+
+
+def _record_response(url: str, identity: Identity, response: curl_requests.Response, started: float) -> bool:
+    host = get_host(url)
+    success = response.status_code != 403
+    latency = time.monotonic() - started
+    identity_manager.record(host, identity, success, latency)
+    if success:
+        latency_tracker.record(host, latency)
+        if not is_streamed(response):
+            latency_tracker.record(get_endpoint(url), latency)
+    else:
+        logger.warning(f"Blocked with identity {identity} for {host}")
+    return success
+
+
+def _hedging(host: str, request_kw: dict) -> bool:
+    if get_hedge_policy(host, current_invocation().hedge) is None:
+        return False
+    if request_kw.get("stream"):
+        # A streamed async response cannot be read synchronously
+        return False
     try:
-        response = request_by_cloud_scraper(url, method, mobile=mobile, desktop=desktop, **request_kw)
-    except (curl_requests.exceptions.SSLError, curl_requests.exceptions.ConnectionError) as e:
-        logger.warning(f"Request error with random client header", exc_info=True)
-        exception = e
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return True
+    # Called synchronously from a coroutine, the loop of this thread is busy and cannot run the hedged attempts
+    return False
 
-    if mobile and desktop:
-        try:
-            if response is None or response.status_code == 403:
-                response = request_by_cloud_scraper(url, method, mobile=False, **request_kw)
-        except (curl_requests.exceptions.SSLError, curl_requests.exceptions.ConnectionError) as e:
-            logger.warning(f"Request error with desktop client header", exc_info=True)
-            exception = e
 
+def _request_with_identities(url: str, method: RequestMethod, mobile: bool, desktop: bool, **request_kw):
+    host = get_host(url)
+    if _hedging(host, request_kw):
+        # Only the async transport can cancel the losing attempt
+        return run(_request_with_identities_async(url, method, mobile, desktop, **request_kw))
+
+    hint = request_kw.pop("impersonate", None)
+
+    response = None
+    exception = None
+
+    for identity in identity_manager.candidates(host, mobile, desktop, hint)[:MAX_IDENTITY_ATTEMPTS]:
+        started = time.monotonic()
         try:
-            if response is None or response.status_code == 403:
-                response = request_by_cloud_scraper(url, method, desktop=False, **request_kw)
+            response = request_by_cloud_scraper(url, method, identity, **request_kw)
         except (curl_requests.exceptions.SSLError, curl_requests.exceptions.ConnectionError) as e:
-            logger.warning(f"Request error with mobile client header", exc_info=True)
+            logger.warning(f"Request error with identity {identity}", exc_info=True)
+            identity_manager.record(host, identity, False)
             exception = e
+            continue
+        if _record_response(url, identity, response, started):
+            break
 
     if response is not None:
         return response
@@ -102,20 +300,148 @@ def request(url: str, method: RequestMethod, mobile: bool = True, desktop: bool
     raise RuntimeError("Code should not reach here. Response is None.")
 
 
-def request_by_cloud_scraper(url: str, method: RequestMethod, mobile: bool = True, desktop: bool = True, impersonate="chrome", **request_kw):
-    request_kw["impersonate"] = impersonate
+def request(url: str, method: RequestMethod, mobile: bool = True, desktop: bool = True, **request_kw):
+    invocation = current_invocation()
+    invocation.last_host = host = get_host(url)
+    policy = invocation.get_retry_policy(host)
+    breaker = get_circuit_breaker(host)
+
+    for attempt in itertools.count():
+        breaker.before_request()
+        try:
+            response = _request_with_identities(url, method, mobile, desktop, **request_kw)
+        except Exception as e:
+            if (delay := policy.retry_delay(attempt, invocation.retry_budget, exception=e)) is None or not invocation.within_deadline(delay):
+                raise
+            logger.warning(f"Retry {url} in {delay:.2f}s after {type(e).__name__}: {e}")
+        else:
+            if (delay := policy.retry_delay(attempt, invocation.retry_budget, status_code=response.status_code)) is None or not invocation.within_deadline(delay):
+                return response
+            logger.warning(f"Retry {url} in {delay:.2f}s after status code {response.status_code}")
+        time.sleep(delay)
+
 
-    if not mobile:
-        platforms = ['linux', 'windows', 'darwin']
+async def _attempt_async(url: str, method: RequestMethod, identity: Identity, **request_kw) -> tuple[curl_requests.Response, bool]:
+    host = get_host(url)
+    started = time.monotonic()
+    try:
+        response = await request_by_cloud_scraper_async(url, method, identity, **request_kw)
+    except (curl_requests.exceptions.SSLError, curl_requests.exceptions.ConnectionError):
+        logger.warning(f"Request error with identity {identity}", exc_info=True)
+        identity_manager.record(host, identity, False)
+        raise
+    return response, _record_response(url, identity, response, started)
 
-        scraper = CloudScraper(browser={"mobile": False, "platform": random.SystemRandom().choice(platforms)})
-    elif not desktop:
-        scraper = CloudScraper(browser={"dessktop": False, "browser": "chrome"})
-    else:
-        scraper = CloudScraper()
 
-    headers = {
-        'User-Agent': scraper.headers['User-Agent'], 
+async def _request_with_identities_async(url: str, method: RequestMethod, mobile: bool, desktop: bool, **request_kw):
+    host = get_host(url)
+    hint = request_kw.pop("impersonate", None)
+    identities = identity_manager.candidates(host, mobile, desktop, hint)[:MAX_IDENTITY_ATTEMPTS]
+
+    # Without hedging the identities are tried one after another. With hedging, the next identity
+    # starts in parallel once the running one is slower than the host's latency percentile.
+    hedge_policy = get_hedge_policy(host, current_invocation().hedge)
+    hedge_delay = hedge_policy.delay(host) if hedge_policy is not None else None
+
+    response = None
+    exception = None
+
+    # Every answer received, the ones not returned are closed so a streamed body does not hold its connection
+    responses: list[curl_requests.Response] = []
+    kept = None
+
+    remaining = iter(identities)
+    pending: set[asyncio.Task] = set()
+
+    def _start_next() -> bool:
+        if (identity := next(remaining, None)) is None:
+            return False
+        pending.add(asyncio.create_task(_attempt_async(url, method, identity, **request_kw)))
+        return True
+
+    _start_next()
+    try:
+        while pending:
+            timeout = hedge_delay if len(pending) == 1 else None
+            done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                if _start_next():
+                    logger.info(f"Hedge {url} after {hedge_delay:.2f}s")
+                else:
+                    hedge_delay = None
+                continue
+
+            for task in done:
+                pending.discard(task)
+                try:
+                    response, success = task.result()
+                except curl_requests.exceptions.RequestException as e:
+                    exception = e
+                    # A timeout is final unless the other attempt is still running
+                    if not isinstance(e, curl_requests.exceptions.ConnectionError) and not pending:
+                        raise
+                else:
+                    responses.append(response)
+                    if success and kept is None:
+                        kept = response
+            if kept is not None:
+                return kept
+            if not pending:
+                _start_next()
+
+        # No identity succeeded, the last answer tells why
+        kept = response
+    finally:
+        # The first good response wins, cancel the slower attempt
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending)
+            # Attempts which finished before the cancellation reached them
+            responses.extend(task.result()[0] for task in pending if not task.cancelled() and task.exception() is None)
+        for other in responses:
+            if other is not kept:
+                await _close_response(other)
+
+    if kept is not None:
+        return kept
+
+    if exception is not None:
+        raise exception from None
+    raise RuntimeError("Code should not reach here. Response is None.")
+
+
+async def request_async(url: str, method: RequestMethod, mobile: bool = True, desktop: bool = True, **request_kw):
+    invocation = current_invocation()
+    invocation.last_host = host = get_host(url)
+    policy = invocation.get_retry_policy(host)
+    breaker = get_circuit_breaker(host)
+
+    for attempt in itertools.count():
+        breaker.before_request()
+        try:
+            response = await _request_with_identities_async(url, method, mobile, desktop, **request_kw)
+        except Exception as e:
+            if (delay := policy.retry_delay(attempt, invocation.retry_budget, exception=e)) is None or not invocation.within_deadline(delay):
+                raise
+            logger.warning(f"Retry {url} in {delay:.2f}s after {type(e).__name__}: {e}")
+        else:
+            if (delay := policy.retry_delay(attempt, invocation.retry_budget, status_code=response.status_code)) is None or not invocation.within_deadline(delay):
+                return response
+            logger.warning(f"Retry {url} in {delay:.2f}s after status code {response.status_code}")
+        await asyncio.sleep(delay)
+
+
+# Negotiated and decoded by curl, large HTML tables compress well
+ACCEPT_ENCODING = "br, gzip, zstd"
+
+
+def _build_headers(url: str, identity: Identity) -> dict:
+    browser, version = impersonated_browser(identity.impersonate)
+    user_agent = cookie_store.user_agent(jar_key(get_host(url), identity), lambda: header_profiles.user_agent(platform=identity.platform, browser=browser, version=version))
+
+    return {
+        'User-Agent': user_agent, 
         'Accept': 'application/json, text/plain, */*', 
         'Accept-Language': 'en-US,en;q=0.9', 
         # 'Referer': 'https://www.moneydj.com/XQMBondPo/api/Data/GetProdHist',
@@ -124,18 +450,96 @@ def request_by_cloud_scraper(url: str, method: RequestMethod, mobile: bool = Tru
         'Origin': '/'.join(url.split('/')[:3]),  # Extract scheme://hostname from URL
     }
 
+
+def _record_transfer(response: curl_requests.Response, streamed_size: int | None = None, streamed_seconds: float | None = None) -> RequestTiming:
+    invocation = current_invocation()
+    timing = request_timing(response, streamed_size, streamed_seconds)
+    invocation.timings.append(timing)
+    if streamed_size is not None:
+        # The timeout covers the whole body, not only the headers seen by _record_response
+        latency_tracker.record(get_endpoint(response.url), timing.total)
+    transfer_counter.record(invocation.data_type, timing.size_download, timing.size_decoded)
+    return timing
+
+
+# Shorter timeouts are rounded down by curl to 0 ms, that is no timeout at all
+MIN_REQUEST_TIMEOUT = 1.0
+
+
+def _max_wait() -> float | None:
+    # Waiting for the rate limit or a free slot leaves enough time for the request itself
+    invocation = current_invocation()
+    invocation.check_deadline(MIN_REQUEST_TIMEOUT)
+    if (remaining := invocation.remaining()) is None:
+        return None
+    return remaining - MIN_REQUEST_TIMEOUT
+
+
+def _apply_timeout(url: str, request_kw: dict) -> dict:
+    invocation = current_invocation()
+    invocation.check_deadline(MIN_REQUEST_TIMEOUT)
+    timeout = invocation.clamp_timeout(request_timeout(url, request_kw.get("timeout")))
+    if timeout is None:
+        return request_kw
+    return {**request_kw, "timeout": timeout}
+
+
+def request_by_cloud_scraper(url: str, method: RequestMethod, identity: Identity, **request_kw):
+    request_kw["impersonate"] = identity.impersonate
+    # The header of the impersonated browser wins over accept_encoding alone
+    accept_encoding = request_kw.setdefault("accept_encoding", ACCEPT_ENCODING)
+    headers = {**_build_headers(url, identity), "Accept-Encoding": accept_encoding, **request_kw.pop("headers", {})}
+
+    if method not in (RequestMethod.POST, RequestMethod.GET):
+        raise ValueError(f"Unsupported method {method=}")
+
+    host = get_host(url)
+    session = get_session(url, identity)
+    rate_limit.acquire(host, _max_wait())
+    request_kw = _apply_timeout(url, request_kw)
     try:
-        if method == RequestMethod.POST:
-            return curl_requests.post(url, headers=headers, **request_kw)
-        elif method == RequestMethod.GET:
-            return curl_requests.get(url, headers=headers, **request_kw)
+        response = session.request(method.value.upper(), url, headers=headers, cookies=cookie_store.load(jar_key(host, identity)), **request_kw)
+    except (curl_requests.exceptions.SSLError, curl_requests.exceptions.ConnectionError):
+        discard_session(url, identity) # Do not reuse a connection which may be broken
+        raise
     except curl_requests.exceptions.Timeout:
-        time.sleep(10)
+        _record_timeout(url, request_kw.get("timeout"))
+        raise
+    cookie_store.save(jar_key(host, identity), response)
+    if request_kw.get("stream") and not is_streamed(response):
+        # Error pages, blocked identities and 304 are small, read them like any other response
+        response.content = b"".join(response.iter_content())
+        response.close()
+    if not is_streamed(response):
+        _record_transfer(response)
+    return response
+
+
+async def request_by_cloud_scraper_async(url: str, method: RequestMethod, identity: Identity, **request_kw):
+    request_kw["impersonate"] = identity.impersonate
+    # The header of the impersonated browser wins over accept_encoding alone
+    accept_encoding = request_kw.setdefault("accept_encoding", ACCEPT_ENCODING)
+    headers = {**_build_headers(url, identity), "Accept-Encoding": accept_encoding, **request_kw.pop("headers", {})}
+
+    if method not in (RequestMethod.POST, RequestMethod.GET):
+        raise ValueError(f"Unsupported method {method=}")
+
+    host = get_host(url)
+    session = get_async_session(url, identity)
+    async with host_slot(host, _max_wait()):
+        await rate_limit.acquire_async(host, _max_wait())
+        request_kw = _apply_timeout(url, request_kw)
         try:
-            if method == RequestMethod.POST:
-                return curl_requests.post(url, headers=headers, **request_kw)
-            elif method == RequestMethod.GET:
-                return curl_requests.get(url, headers=headers, **request_kw)
-        except Exception as e:
-            raise e from None
-    raise ValueError(f"Unsupported method {method=}")
+            response = await session.request(method.value.upper(), url, headers=headers, cookies=cookie_store.load(jar_key(host, identity)), **request_kw)
+        except (curl_requests.exceptions.SSLError, curl_requests.exceptions.ConnectionError):
+            await discard_async_session(url, identity) # Do not reuse a connection which may be broken
+            raise
+        except curl_requests.exceptions.Timeout:
+            _record_timeout(url, request_kw.get("timeout"))
+            raise
+    cookie_store.save(jar_key(host, identity), response)
+    if request_kw.get("stream") and not is_streamed(response):
+        response.content = await response.acontent()
+    if not is_streamed(response):
+        _record_transfer(response)
+    return response
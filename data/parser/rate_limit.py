@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import threading
+import time
+
+from ..exception import DeadlineExceeded
+
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        if rate <= 0:
+            raise ValueError(f"Rate should be positive. Got {rate=}")
+        if burst < 1:
+            raise ValueError(f"Burst should be at least 1. Got {burst=}")
+
+        self.rate = rate
+        self.burst = burst
+
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        # Take a token now, possibly borrowing from the future, and return how long the caller should wait for it
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def refund(self) -> None:
+        # Give back a reserved token which was never used, e.g. the request was cancelled while waiting
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + 1)
+
+    def _reserve_within(self, max_wait: float | None) -> float:
+        wait = self.reserve()
+        if max_wait is not None and wait > max_wait:
+            self.refund()
+            raise DeadlineExceeded(f"Rate limit needs {wait:.2f}s, only {max_wait:.2f}s to wait")
+        return wait
+
+    def acquire(self, max_wait: float | None = None) -> float:
+        if (wait := self._reserve_within(max_wait)) > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, max_wait: float | None = None) -> float:
+        if (wait := self._reserve_within(max_wait)) > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self.refund()
+                raise
+        return wait
+
+
+# (requests per second, burst), the former per call site delays
+DEFAULT_HOST_RATE_LIMITS = {
+    "mops.twse.com.tw": (1 / 1.26, 1),
+    "mopsov.twse.com.tw": (1 / 1.26, 2),
+    "www.twse.com.tw": (1 / 1.32, 1),
+    "www.tpex.org.tw": (1 / 1.12, 1),
+}
+
+_rate_limiters: dict[str, TokenBucket | None] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def configure_rate_limit(host: str, rate: float | None, burst: int = 1) -> None:
+    with _rate_limiters_lock:
+        _rate_limiters[host] = None if rate is None else TokenBucket(rate, burst)
+
+
+def get_rate_limiter(host: str) -> TokenBucket | None:
+    with _rate_limiters_lock:
+        if host not in _rate_limiters:
+            if host in DEFAULT_HOST_RATE_LIMITS:
+                rate, burst = DEFAULT_HOST_RATE_LIMITS[host]
+                _rate_limiters[host] = TokenBucket(rate, burst)
+            else:
+                _rate_limiters[host] = None
+        return _rate_limiters[host]
+
+
+def acquire(host: str, max_wait: float | None = None) -> None:
+    if (rate_limiter := get_rate_limiter(host)) is not None:
+        if (wait := rate_limiter.acquire(max_wait)) > 0:
+            logger.info(f"Waited {wait:.2f}s for rate limit of {host}")
+
+
+async def acquire_async(host: str, max_wait: float | None = None) -> None:
+    if (rate_limiter := get_rate_limiter(host)) is not None:
+        if (wait := await rate_limiter.acquire_async(max_wait)) > 0:
+            logger.info(f"Waited {wait:.2f}s for rate limit of {host}")
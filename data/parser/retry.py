@@ -0,0 +1,91 @@
+import logging
+import random
+
+from typing import Sequence
+
+from curl_cffi import requests as curl_requests
+
+from ..exception import BlockingByWebsiteError, WebsiteMaintaince
+
+
+logger = logging.getLogger(__name__)
+
+
+class RetryBudget:
+
+    def __init__(self, retries: int) -> None:
+        self.remaining = retries
+
+    def consume(self) -> bool:
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+
+class RetryPolicy:
+
+    def __init__(self,
+        max_attempts: int = 3,
+        backoff_base: float = 1.0,
+        backoff_max: float = 20.0,
+        jitter: float = 1.0,
+        retryable_status_codes: Sequence[int] = (429, 500, 502, 503, 504),
+        retryable_exceptions: Sequence[type[Exception]] = (
+            curl_requests.exceptions.Timeout,
+            curl_requests.exceptions.ConnectionError,
+            BlockingByWebsiteError,
+            WebsiteMaintaince,
+        ),
+    ) -> None:
+        if max_attempts < 1:
+            raise ValueError(f"Expect at least 1 attempt. Got {max_attempts=}")
+        if not 0 <= jitter <= 1:
+            raise ValueError(f"Jitter should be between 0 and 1. Got {jitter=}")
+
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.retryable_status_codes = frozenset(retryable_status_codes)
+        self.retryable_exceptions = tuple(retryable_exceptions)
+
+        self._random = random.SystemRandom()
+
+    def backoff(self, attempt: int) -> float:
+        # Exponential backoff, the jitter part of it is randomized so concurrent callers spread out
+        delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        return delay * (1 - self.jitter) + self._random.uniform(0, delay * self.jitter)
+
+    def is_retryable(self, exception: BaseException | None = None, status_code: int | None = None) -> bool:
+        if exception is not None:
+            return isinstance(exception, self.retryable_exceptions)
+        return status_code in self.retryable_status_codes
+
+    def retry_delay(self, attempt: int, budget: RetryBudget, exception: BaseException | None = None, status_code: int | None = None) -> float | None:
+        # Seconds to wait before the next attempt (counted from 0), None when giving up
+        if not self.is_retryable(exception, status_code):
+            return None
+        if attempt + 1 >= self.max_attempts:
+            logger.warning(f"Give up after {attempt + 1} attempts. {exception=} {status_code=}")
+            return None
+        if not budget.consume():
+            logger.warning(f"Retry budget exhausted. {exception=} {status_code=}")
+            return None
+        return self.backoff(attempt)
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+_retry_policies: dict[tuple[str | None, str | None], RetryPolicy] = {}
+
+
+def configure_retry_policy(policy: RetryPolicy, data_type: str | None = None, host: str | None = None) -> None:
+    _retry_policies[(data_type, host)] = policy
+
+
+def get_retry_policy(data_type: str | None = None, host: str | None = None) -> RetryPolicy:
+    for key in ((data_type, host), (data_type, None), (None, host)):
+        if key in _retry_policies:
+            return _retry_policies[key]
+    return _retry_policies.get((None, None), DEFAULT_RETRY_POLICY)
@@ -0,0 +1,79 @@
+import asyncio
+import logging
+import threading
+import weakref
+
+from urllib.parse import urlsplit
+
+from curl_cffi import requests as curl_requests
+
+from .identity import Identity
+from .timing import TIMING_INFOS
+
+
+logger = logging.getLogger(__name__)
+
+
+# Sessions live at module level so warm Lambda invocations keep their
+# TCP/TLS connections to every host alive. One session per identity of a host, with the
+# user agent and cookie jar of that identity.
+_sessions: dict[tuple[str, Identity], curl_requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+# AsyncSession is bound to the event loop it was created on
+_async_sessions: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[tuple[str, Identity], curl_requests.AsyncSession]] = weakref.WeakKeyDictionary()
+
+
+def get_host(url: str) -> str:
+    return urlsplit(url).netloc
+
+
+def get_session(url: str, identity: Identity) -> curl_requests.Session:
+    key = (get_host(url), identity)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            logger.info(f"Create session for {key=}")
+            session = _sessions[key] = curl_requests.Session(impersonate=identity.impersonate, curl_infos=TIMING_INFOS)
+    return session
+
+
+def discard_session(url: str, identity: Identity) -> None:
+    key = (get_host(url), identity)
+    with _sessions_lock:
+        session = _sessions.pop(key, None)
+    if session is not None:
+        logger.info(f"Discard session for {key=}")
+        session.close()
+
+
+def close_sessions() -> None:
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
+
+
+def get_async_session(url: str, identity: Identity) -> curl_requests.AsyncSession:
+    key = (get_host(url), identity)
+    sessions = _async_sessions.setdefault(asyncio.get_running_loop(), {})
+    session = sessions.get(key)
+    if session is None:
+        logger.info(f"Create async session for {key=}")
+        session = sessions[key] = curl_requests.AsyncSession(impersonate=identity.impersonate, curl_infos=TIMING_INFOS)
+    return session
+
+
+async def discard_async_session(url: str, identity: Identity) -> None:
+    key = (get_host(url), identity)
+    session = _async_sessions.get(asyncio.get_running_loop(), {}).pop(key, None)
+    if session is not None:
+        logger.info(f"Discard async session for {key=}")
+        await session.close()
+
+
+async def close_async_sessions() -> None:
+    sessions = _async_sessions.pop(asyncio.get_running_loop(), {})
+    for session in sessions.values():
+        await session.close()
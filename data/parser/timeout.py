@@ -0,0 +1,62 @@
+import logging
+import threading
+
+from urllib.parse import urlsplit
+
+from .latency import latency_tracker
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_endpoint(url: str) -> str:
+    # Query strings are dropped, latencies are shared by every request to the same path
+    split = urlsplit(url)
+    return f"{split.netloc}{split.path}"
+
+
+class AdaptiveTimeout:
+
+    def __init__(self, percentile: float = 0.99, multiplier: float = 3.0, min_timeout: float = 5.0, max_timeout: float = 180.0) -> None:
+        if not 0 < percentile <= 1:
+            raise ValueError(f"Percentile should be in (0, 1]. Got {percentile=}")
+        if min_timeout > max_timeout:
+            raise ValueError(f"Expect {min_timeout=} <= {max_timeout=}")
+
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+
+    def timeout(self, endpoint: str, default: float | str | tuple | None = None) -> float | str | tuple | None:
+        # The static timeout of the parser is kept until the endpoint has enough samples
+        latency = latency_tracker.percentile(endpoint, self.percentile)
+        if latency is None:
+            return default
+        return min(self.max_timeout, max(self.min_timeout, latency * self.multiplier))
+
+
+DEFAULT_ADAPTIVE_TIMEOUT = AdaptiveTimeout()
+
+_adaptive_timeouts: dict[str | None, AdaptiveTimeout | None] = {}
+_adaptive_timeouts_lock = threading.Lock()
+
+
+def configure_adaptive_timeout(policy: AdaptiveTimeout | None, host: str | None = None) -> None:
+    # None disables adaptive timeouts, for the host or for every host without its own policy
+    with _adaptive_timeouts_lock:
+        _adaptive_timeouts[host] = policy
+
+
+def get_adaptive_timeout(host: str) -> AdaptiveTimeout | None:
+    with _adaptive_timeouts_lock:
+        if host in _adaptive_timeouts:
+            return _adaptive_timeouts[host]
+        return _adaptive_timeouts.get(None, DEFAULT_ADAPTIVE_TIMEOUT)
+
+
+def request_timeout(url: str, default: float | str | tuple | None = None) -> float | str | tuple | None:
+    policy = get_adaptive_timeout(urlsplit(url).netloc)
+    if policy is None:
+        return default
+    return policy.timeout(get_endpoint(url), default)
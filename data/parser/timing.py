@@ -0,0 +1,62 @@
+import logging
+
+from collections import namedtuple
+
+from curl_cffi import CurlInfo
+from curl_cffi import requests as curl_requests
+
+
+logger = logging.getLogger(__name__)
+
+
+# Cumulative seconds from the start of the request, as reported by curl.
+# size_download is the body on the wire, size_decoded after decompression.
+RequestTiming = namedtuple("RequestTiming", [
+        "url",
+        "status_code",
+        "namelookup",
+        "connect",
+        "appconnect",
+        "starttransfer",
+        "total",
+        "size_download",
+        "size_decoded",
+    ]
+)
+
+
+TIMING_INFOS = [
+    CurlInfo.NAMELOOKUP_TIME,
+    CurlInfo.CONNECT_TIME,
+    CurlInfo.APPCONNECT_TIME,
+    CurlInfo.STARTTRANSFER_TIME,
+    CurlInfo.TOTAL_TIME,
+    CurlInfo.SIZE_DOWNLOAD_T,
+]
+
+
+def request_timing(response: curl_requests.Response, streamed_size: int | None = None, streamed_seconds: float | None = None) -> RequestTiming:
+    infos = response.infos
+    if streamed_size is None:
+        total = infos.get(CurlInfo.TOTAL_TIME, response.elapsed)
+        size_download = infos.get(CurlInfo.SIZE_DOWNLOAD_T)
+        size_decoded = len(response.content)
+    else:
+        # Infos of a streamed response are taken when the headers arrive, the body is measured while reading it
+        total = (infos.get(CurlInfo.STARTTRANSFER_TIME) or 0) + streamed_seconds
+        size_download = None
+        size_decoded = streamed_size
+
+    timing = RequestTiming(
+        url=response.url,
+        status_code=response.status_code,
+        namelookup=infos.get(CurlInfo.NAMELOOKUP_TIME),
+        connect=infos.get(CurlInfo.CONNECT_TIME),
+        appconnect=infos.get(CurlInfo.APPCONNECT_TIME),
+        starttransfer=infos.get(CurlInfo.STARTTRANSFER_TIME),
+        total=total,
+        size_download=size_download,
+        size_decoded=size_decoded,
+    )
+    logger.debug(f"Timing {timing}")
+    return timing
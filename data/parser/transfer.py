@@ -0,0 +1,45 @@
+import logging
+import threading
+
+from collections import namedtuple
+
+
+logger = logging.getLogger(__name__)
+
+
+TransferStats = namedtuple("TransferStats", [
+        "requests",
+        "wire_bytes",
+        "decoded_bytes",
+    ]
+)
+
+
+class TransferCounter:
+
+    def __init__(self) -> None:
+        self._stats: dict[str | None, TransferStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, data_type: str | None, wire_bytes: int | None, decoded_bytes: int) -> None:
+        # Without curl infos, e.g. a session created elsewhere, count the body as uncompressed
+        wire_bytes = decoded_bytes if wire_bytes is None else wire_bytes
+        with self._lock:
+            stats = self._stats.get(data_type, TransferStats(0, 0, 0))
+            stats = self._stats[data_type] = TransferStats(stats.requests + 1, stats.wire_bytes + wire_bytes, stats.decoded_bytes + decoded_bytes)
+        logger.debug(f"Transfer {data_type=} {wire_bytes=} {decoded_bytes=}, total {stats}")
+
+    def get(self, data_type: str | None) -> TransferStats:
+        with self._lock:
+            return self._stats.get(data_type, TransferStats(0, 0, 0))
+
+    def snapshot(self) -> dict[str | None, TransferStats]:
+        with self._lock:
+            return dict(self._stats)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+transfer_counter = TransferCounter()
@@ -4,10 +4,13 @@ import logging
 
 from datetime import datetime
 
+from curl_cffi.requests import Response
+
 from ..model import ETFDividend
 from ..constant import RequestMethod, ETF_Country
 from ..exception import WrongDataFormat
 from ..parser import DataParser
+from ..parser.fan_out import FanOutParser, fan_out_or_single
 
 
 # https://www.pocket.tw/etf/tw/0050/cashdividend
@@ -18,6 +21,8 @@ logger = logging.getLogger(__name__)
 
 class PocketETFDividendParser(DataParser):
 
+    revalidate_attributes = ("_data",)
+
     def __init__(self, request_cloud_scraper_mobile: bool, request_cloud_scraper_desktop: bool, etf_id: str, etf_country: str, years: str) -> None:
         super().__init__(
             request_method=RequestMethod.GET,
@@ -47,9 +52,7 @@ class PocketETFDividendParser(DataParser):
     def data(self):
         return self._data
 
-    def parse_response(self) -> None:
-        response = self.request()
-
+    def handle_response(self, response: Response) -> None:
         response.raise_for_status()
 
         response_text = response.text.strip()
@@ -109,3 +112,27 @@ class PocketETFDividendParser(DataParser):
                 )._asdict()
 
         self._data = list(_data())
+
+
+class PocketETFsDividendParser(FanOutParser):
+
+    def __init__(self, request_cloud_scraper_mobile: bool, request_cloud_scraper_desktop: bool, etf_ids: list[str] | dict[str, str], years: str, etf_country: str | None = None, max_concurrency: int | str | None = None) -> None:
+        super().__init__(
+            request_cloud_scraper_mobile=request_cloud_scraper_mobile,
+            request_cloud_scraper_desktop=request_cloud_scraper_desktop,
+            max_concurrency=max_concurrency,
+        )
+
+        # Ids of one country, or ids mapped to their own countries
+        etf_countries = etf_ids if isinstance(etf_ids, dict) else dict.fromkeys(etf_ids, etf_country)
+        self.etf_countries = {etf_id: ETF_Country(country) for etf_id, country in etf_countries.items()}
+        self.years = years
+
+    async def keys_async(self) -> list[str]:
+        return list(self.etf_countries)
+
+    def create_parser(self, key: str) -> PocketETFDividendParser:
+        return PocketETFDividendParser(self.request_cloud_scraper_mobile, self.request_cloud_scraper_desktop, key, self.etf_countries[key].value, self.years)
+
+
+parser = fan_out_or_single(PocketETFsDividendParser, PocketETFDividendParser, "etf_ids")
@@ -1,11 +1,15 @@
-import time
+import asyncio
 import itertools
 import logging
 import json
 
+from typing import Hashable, Iterator
+
 import curl_cffi
 
 from ..parser import DataParser
+from ..parser.circuit_breaker import record_circuit
+from ..parser.fan_out import FanOutParser
 from ..parser.html_parser import DataHTMLParser
 from ..constant import RequestMethod
 from ..exception import WrongDataFormat, BlockingByWebsiteError
@@ -39,32 +43,92 @@ class RedirectOldParser(DataParser):
     def get_internal_parser(self, url: str) -> DataParser:
         raise NotImplementedError
 
-    def parse_response(self) -> None:
-        response = self.request()
-
+    def get_redirect_url(self, response: curl_cffi.requests.Response) -> str:
         response.raise_for_status()
 
-        try:
-            response_json = response.json()
-        except (curl_cffi.requests.exceptions.JSONDecodeError, json.decoder.JSONDecodeError):
-            if "THE PAGE CANNOT BE ACCESSED!" in response.text:
-                msg = f"THE PAGE CANNOT BE ACCESSED!\n{response.text}"
-                logger.warning(msg)
-                raise BlockingByWebsiteError("THE PAGE CANNOT BE ACCESSED!")
-            raise Exception(f"Unable to parse response\n{response.text}")
+        with record_circuit(response):
+            try:
+                response_json = response.json()
+            except (curl_cffi.requests.exceptions.JSONDecodeError, json.decoder.JSONDecodeError):
+                if "THE PAGE CANNOT BE ACCESSED!" in response.text:
+                    msg = f"THE PAGE CANNOT BE ACCESSED!\n{response.text}"
+                    logger.warning(msg)
+                    raise BlockingByWebsiteError("THE PAGE CANNOT BE ACCESSED!")
+                raise Exception(f"Unable to parse response\n{response.text}")
 
         if response_json["code"] != 200:
             msg = f"Unexpected code in {response_json}"
             raise Exception(msg)
         
-        time.sleep(1.26) # Small delay
+        return response_json["result"]["url"]
+
+    def parse_response(self) -> None:
+        url = self.get_redirect_url(self.request())
 
-        self.internal_parser = self.get_internal_parser(response_json["result"]["url"])
+        self.internal_parser = self.get_internal_parser(url)
         self.internal_parser.parse_response()
 
+    async def parse_response_async(self) -> None:
+        url = self.get_redirect_url(await self.request_async())
+
+        self.internal_parser = self.get_internal_parser(url)
+        await self.internal_parser.parse_response_async()
+
+
+class RedirectFanOutParser(FanOutParser):
+
+    # Redirects resolved at once, they are paced by the rate limit of mops.twse.com.tw anyway
+    resolve_concurrency = 2
+
+    def create_parser(self, key: Hashable) -> RedirectOldParser:
+        raise NotImplementedError
+
+    async def _resolve(self, keys: Iterator[Hashable], queue: asyncio.Queue) -> None:
+        for key in keys:
+            parser = self.create_parser(key)
+            try:
+                url = parser.get_redirect_url(await parser.request_async())
+            except Exception as e:
+                self._record_error(key, e)
+                continue
+            await queue.put((key, parser, url))
+
+    async def _fetch(self, queue: asyncio.Queue) -> None:
+        while (item := await queue.get()) is not None:
+            key, parser, url = item
+            try:
+                parser.internal_parser = parser.get_internal_parser(url)
+                await parser.internal_parser.parse_response_async()
+                if (data := self.get_key_data(key, parser)) is not None:
+                    self._data[key] = data
+            except Exception as e:
+                self._record_error(key, e)
+
+    async def parse_response_async(self) -> None:
+        # Two stages, redirects of all keys are resolved in key order at the allowed rate
+        # while the tables of the resolved ones are fetched concurrently
+        keys = await self.keys_async()
+        logger.info(f"Pipeline {len(keys)} keys with {self.resolve_concurrency=} {self.max_concurrency=}")
+
+        queue = asyncio.Queue()
+        fetchers = [asyncio.create_task(self._fetch(queue)) for _ in range(self.max_concurrency)]
+        try:
+            pending_keys = iter(keys)
+            await asyncio.gather(*(self._resolve(pending_keys, queue) for _ in range(self.resolve_concurrency)))
+            for _ in fetchers:
+                queue.put_nowait(None)
+            await asyncio.gather(*fetchers)
+        finally:
+            for fetcher in fetchers:
+                fetcher.cancel()
+
+        self._keep_key_order(keys)
+
 
 class TwseHTMLTableParser(DataHTMLParser):
 
+    stream_response = True
+
     def __init__(self, request_cloud_scraper_mobile: bool, request_cloud_scraper_desktop: bool, request_method: RequestMethod, url: str, timeout: str | None = None) -> None:
         super().__init__(
             request_method=request_method,
@@ -97,10 +161,6 @@ class TwseHTMLTableParser(DataHTMLParser):
             "timeout": self.timeout,
         }
     
-    def parse_response(self) -> None:
-        response = self.request()
-        self.feed(response.text)
-
     def handle_starttag(self, tag, attrs):
         if tag == "div" and ("id", "div01") in attrs:
             self._stack.append(tag)
@@ -1,8 +1,11 @@
+import asyncio
 import logging
 import re
 
 from collections import namedtuple
+from datetime import date
 
+from ..parser.fan_out import FanOutParser, fan_out_or_single
 from ..parser.html_parser import DataHTMLParser
 from ..constant import StockType, RequestMethod
 
@@ -14,6 +17,9 @@ logger = logging.getLogger(__name__)
 
 class TwseDividendHTMLParser(DataHTMLParser):
 
+    stream_response = True
+    response_encoding = "big5"
+
     def __init__(self, request_cloud_scraper_mobile: bool, request_cloud_scraper_desktop: bool, stock_type: str, year: str, timeout: str = "180") -> None:
         super().__init__(
             request_method=RequestMethod.GET,
@@ -85,7 +91,7 @@ class TwseDividendHTMLParser(DataHTMLParser):
     @property
     def data(self) -> dict:
         if self.error:
-            raise RuntimeError(f"Error occurred when parsing\n{self.rawdata}")
+            raise RuntimeError(f"Error occurred when parsing\n{self.raw_tail}")
         
         data = {}
         for data_group in self._data_groups:
@@ -133,11 +139,6 @@ class TwseDividendHTMLParser(DataHTMLParser):
         
         return data
     
-    def parse_response(self) -> None:
-        response = self.request()
-        response.encoding = "big5"
-        self.feed(response.text)
-
     def handle_starttag(self, tag, attrs):
         self._stack.append(tag)
         if not self._finished:
@@ -193,6 +194,61 @@ class TwseDividendHTMLParser(DataHTMLParser):
                     self._has_title = True
 
 
+# Whole pages held at once, the year being parsed and the next one downloading
+MAX_PAGES_HELD = 2
+
+
+class TwseDividendYearRangeParser(FanOutParser):
+
+    def __init__(self, request_cloud_scraper_mobile: bool, request_cloud_scraper_desktop: bool, stock_type: str, start_year: str, end_year: str | None = None, timeout: str = "180", max_concurrency: int | str | None = None) -> None:
+        super().__init__(
+            request_cloud_scraper_mobile=request_cloud_scraper_mobile,
+            request_cloud_scraper_desktop=request_cloud_scraper_desktop,
+            max_concurrency=max_concurrency,
+        )
+
+        self.stock_type = StockType(stock_type)
+        self.start_year = int(start_year)
+        self.end_year = int(end_year) if end_year else date.today().year
+        if self.start_year > self.end_year:
+            raise ValueError(f"Expect {start_year=} <= {end_year=}")
+        self.timeout = timeout
+
+    async def keys_async(self) -> list[int]:
+        return list(range(self.start_year, self.end_year + 1))
+
+    def create_parser(self, key: int) -> TwseDividendHTMLParser:
+        # Each year keeps its own header layout
+        return TwseDividendHTMLParser(self.request_cloud_scraper_mobile, self.request_cloud_scraper_desktop, self.stock_type.value, key, self.timeout)
+
+    async def parse_key_async(self, key: int):
+        parser = self.create_parser(key)
+
+        # Download the whole page and parse it in a worker thread, the event loop downloads the next year meanwhile
+        async with self._pages:
+            await asyncio.to_thread(parser.handle_download, await parser.download_async())
+        return await asyncio.to_thread(self.get_key_data, key, parser)
+
+    async def parse_response_async(self) -> None:
+        self._pages = asyncio.Semaphore(MAX_PAGES_HELD)
+        await super().parse_response_async()
+
+    @property
+    def data(self) -> dict:
+        # Dividends of a stock from all years, in the order of the years
+        data: dict[str, list[dict]] = {}
+        for year_data in self._data.values():
+            for stock_id, dividends in year_data.items():
+                data.setdefault(stock_id, []).extend(dividends)
+        return {
+            "data": data,
+            "errors": {str(year): error for year, error in self._errors.items()},
+        }
+
+
+parser = fan_out_or_single(TwseDividendYearRangeParser, TwseDividendHTMLParser, "start_year")
+
+
 def _fill_empty_fields(year: int, stock_id: str, row_data: list[str]):
     if year < 2021:
         if year == 2014 and stock_id == "1231":
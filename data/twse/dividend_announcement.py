@@ -1,12 +1,15 @@
+import heapq
 import logging
 import re
 
 from collections import namedtuple
 from datetime import datetime
+from operator import itemgetter
 
 from .general_csv_parser import TwseCsvFileParser
 from ..constant import StockType, RequestMethod
 from ..exception import WrongDataFormat
+from ..parser.fan_out import FanOutParser
 
 
 # https://mopsov.twse.com.tw/mops/web/t108sb27
@@ -14,6 +17,9 @@ from ..exception import WrongDataFormat
 logger = logging.getLogger(__name__)
 
 
+_sort_key = itemgetter("stock_id", "announcement_date", "announcement_time")
+
+
 class TwseDividendAnnouncementParser(TwseCsvFileParser):
 
     def __init__(self, request_cloud_scraper_mobile: bool, request_cloud_scraper_desktop: bool, stock_type: str, year: str, month: str | None = None, timeout: str = "180") -> None:
@@ -64,6 +70,17 @@ class TwseDividendAnnouncementParser(TwseCsvFileParser):
     
     @property
     def data(self):
+        if (results := self.sorted_data) is None:
+            return None
+
+        for result in results:
+            result.pop("announcement_time")
+
+        return results
+
+    @property
+    def sorted_data(self) -> list[dict] | None:
+        # Sorted by stock_id, announcement_date and announcement_time, the latter is kept for merging
 
         def _strip_number(value: str):
             value = value.replace(",", "")
@@ -153,14 +170,54 @@ class TwseDividendAnnouncementParser(TwseCsvFileParser):
             )._asdict()
             for data in self._data
             if self.year >= 2016 or "特別股" not in _get_stock_name(data)
-        ], key=lambda x: (x["stock_id"], x["announcement_date"], x["announcement_time"]))
-        
-        for result in results:
-            result.pop("announcement_time")
+        ], key=_sort_key)
 
         return results
 
 
+class TwseDividendAnnouncementMarketsParser(FanOutParser):
+
+    STOCK_TYPES = (StockType.PUBLIC, StockType.OTC, StockType.ROTC)
+
+    def __init__(self, request_cloud_scraper_mobile: bool, request_cloud_scraper_desktop: bool, year: str, month: str | None = None, stock_types: list[str] | None = None, timeout: str = "180", max_concurrency: int | str | None = None) -> None:
+        super().__init__(
+            request_cloud_scraper_mobile=request_cloud_scraper_mobile,
+            request_cloud_scraper_desktop=request_cloud_scraper_desktop,
+            max_concurrency=max_concurrency,
+        )
+
+        self.year = year
+        self.month = month
+        self.stock_types = self.STOCK_TYPES if stock_types is None else tuple(StockType(stock_type) for stock_type in stock_types)
+        self.timeout = timeout
+
+    async def keys_async(self) -> list[StockType]:
+        return list(self.stock_types)
+
+    def create_parser(self, key: StockType) -> TwseDividendAnnouncementParser:
+        return TwseDividendAnnouncementParser(self.request_cloud_scraper_mobile, self.request_cloud_scraper_desktop, key.value, self.year, self.month, self.timeout)
+
+    def get_key_data(self, key: StockType, parser: TwseDividendAnnouncementParser):
+        return parser.sorted_data
+
+    @property
+    def data(self) -> dict:
+        # Each market is sorted already, a k-way merge gives the global order
+        return {
+            "data": [
+                {key: value for key, value in result.items() if key != "announcement_time"}
+                for result in heapq.merge(*self._data.values(), key=_sort_key)
+            ],
+            "errors": {stock_type.value: error for stock_type, error in self._errors.items()},
+        }
+
+
+def parser(*args, stock_type: str | None = None, **kw):
+    if stock_type is None:
+        return TwseDividendAnnouncementMarketsParser(*args, **kw)
+    return TwseDividendAnnouncementParser(*args, stock_type=stock_type, **kw)
+
+
 DividendAnnouncement = namedtuple("DividendAnnouncement", [
         "stock_id", 
         "stock_name",
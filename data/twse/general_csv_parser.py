@@ -4,6 +4,8 @@ import re
 
 from io import StringIO
 
+from curl_cffi.requests import Response
+
 from ..parser import DataParser
 from ..constant import RequestMethod
 from ..exception import WrongDataFormat
@@ -38,26 +40,33 @@ class TwseCsvFileParser(DataParser):
     def data(self):
         return self._data
     
-    def parse_response(self) -> None:
-        response = self.request()
+    def get_csv_parser(self, response: Response) -> "_TwseCsvFileContentParser | None":
         response_html = response.text
 
         if "查無符合條件之資料" in response_html:
-            return
+            return None
         elif m := re.search(self.file_name_pattern, response_html):
             got_csv_file_name = m.group(1)
             logger.warning(f"Got CSV file name: {got_csv_file_name}")
-            csv_parser = _TwseCsvFileContentParser(
+            return _TwseCsvFileContentParser(
                 request_cloud_scraper_mobile=self.request_cloud_scraper_mobile,
                 request_cloud_scraper_desktop=self.request_cloud_scraper_desktop,
                 file_name=got_csv_file_name,
                 timeout=self.timeout,
             )
-            csv_parser.parse_response()
-            self._data = csv_parser.data
         else:
             raise WrongDataFormat(f"[twse] Cannot find dividend announcement csv filename in response\n{response_html}")
 
+    def parse_response(self) -> None:
+        if csv_parser := self.get_csv_parser(self.request()):
+            csv_parser.parse_response()
+            self._data = csv_parser.data
+
+    async def parse_response_async(self) -> None:
+        if csv_parser := self.get_csv_parser(await self.request_async()):
+            await csv_parser.parse_response_async()
+            self._data = csv_parser.data
+
 
 class _TwseCsvFileContentParser(DataParser):
 
@@ -92,8 +101,7 @@ class _TwseCsvFileContentParser(DataParser):
     def data(self):
         return self.raw_data
     
-    def parse_response(self) -> None:
-        response = self.request()
+    def handle_response(self, response: Response) -> None:
         response.encoding = "big5"
         response_text = response.text
         reader = csv.reader(StringIO(response_text))
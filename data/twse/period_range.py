@@ -0,0 +1,62 @@
+from datetime import date
+
+from ..constant import StockType
+
+
+# All markets unless given
+STOCK_TYPES = (StockType.PUBLIC, StockType.OTC, StockType.ROTC)
+
+
+def parse_stock_types(stock_types: list[str] | str | None) -> tuple[StockType, ...]:
+    if stock_types is None:
+        return STOCK_TYPES
+    if isinstance(stock_types, str):
+        return (StockType(stock_types),)
+    return tuple(StockType(stock_type) for stock_type in stock_types)
+
+
+# Month and day the filings of a quarter are due, those of the 4th quarter with the annual report of the next year
+QUARTER_DEADLINES = {1: (5, 15), 2: (8, 14), 3: (11, 14), 4: (3, 31)}
+
+
+def last_published(periods_per_year: int, today: date) -> tuple[int, int]:
+    # A month is published once it ended, a quarter once its filing deadline passed
+    year, period = today.year, (today.month - 1) * periods_per_year // 12 + 1
+    while True:
+        year, period = (year - 1, periods_per_year) if period == 1 else (year, period - 1)
+        if periods_per_year != 4:
+            return year, period
+        month, day = QUARTER_DEADLINES[period]
+        if date(year + 1 if period == 4 else year, month, day) < today:
+            return year, period
+
+
+class PeriodRange:
+
+    def __init__(self, period_name: str, periods_per_year: int, start_year: int, start_period: int, end_year: int | None = None, end_period: int | None = None, stock_types: list[str] | str | None = None) -> None:
+        # Periods of a year counted from 1, e.g. 12 months or 4 quarters. The last published period when the end is not given.
+        published = last_published(periods_per_year, date.today())
+        self.periods_per_year = periods_per_year
+        self.start = (int(start_year), int(start_period))
+        if end_period:
+            self.end = (int(end_year) if end_year else published[0], int(end_period))
+        else:
+            self.end = min((int(end_year), periods_per_year), published) if end_year else published
+        for year, period in (self.start, self.end):
+            if not 1 <= period <= periods_per_year:
+                raise ValueError(f"Expect {period_name} between 1 and {periods_per_year}. Got {year=} {period_name}={period}")
+        if self.start > self.end:
+            raise ValueError(f"Expect start {self.start} <= end {self.end}")
+
+        self.stock_types = parse_stock_types(stock_types)
+
+    def periods(self) -> list[tuple[int, int]]:
+        periods = []
+        year, period = self.start
+        while (year, period) <= self.end:
+            periods.append((year, period))
+            year, period = (year + 1, 1) if period == self.periods_per_year else (year, period + 1)
+        return periods
+
+    def keys(self) -> list[tuple[int, int, StockType]]:
+        return [(year, period, stock_type) for year, period in self.periods() for stock_type in self.stock_types]
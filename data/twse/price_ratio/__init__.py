@@ -1,8 +1,11 @@
+from .date_range import TwsePriceRatioDateRangeParser
 from .otc import TwseOTCPriceRatioParser
 from .public import TwsePublicPriceRatioParser
 
 
-def parser(*args, stock_type: str, **kw):
+def parser(*args, stock_type: str | None = None, **kw):
+    if "start_date" in kw:
+        return TwsePriceRatioDateRangeParser(*args, stock_type=stock_type, **kw)
     return {
         "上市": TwsePublicPriceRatioParser,
         "上櫃": TwseOTCPriceRatioParser,
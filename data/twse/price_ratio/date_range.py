@@ -0,0 +1,111 @@
+import logging
+import threading
+import time
+
+from datetime import date, timedelta
+
+from .otc import TwseOTCPriceRatioParser
+from .public import TwsePublicPriceRatioParser
+from ...constant import StockType
+from ...parser.circuit_breaker import record_circuit
+from ...parser.fan_out import FanOutParser
+
+
+logger = logging.getLogger(__name__)
+
+
+# Seconds a "no data" answer is trusted, a transient empty answer is asked again afterwards
+NON_TRADING_DATE_TTL = 6 * 60 * 60
+
+
+class NonTradingDates:
+
+    def __init__(self, ttl: float = NON_TRADING_DATE_TTL) -> None:
+        self.ttl = ttl
+
+        # (stock_type, date) -> when it was learned, markets do not share their holidays and history
+        self._learned: dict[tuple[StockType, date], float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stock_type: StockType, the_date: date) -> None:
+        with self._lock:
+            self._learned[(stock_type, the_date)] = time.monotonic()
+
+    def get(self, stock_type: StockType) -> set[date]:
+        with self._lock:
+            now = time.monotonic()
+            self._learned = {key: learned_at for key, learned_at in self._learned.items() if now - learned_at < self.ttl}
+            return {the_date for the_stock_type, the_date in self._learned if the_stock_type is stock_type}
+
+
+# Weekdays without trading, e.g. national holidays, learned from "no data" answers of past dates
+_non_trading_dates = NonTradingDates()
+
+
+class TwsePriceRatioDateRangeParser(FanOutParser):
+
+    PARSERS = {
+        StockType.PUBLIC: TwsePublicPriceRatioParser,
+        StockType.OTC: TwseOTCPriceRatioParser,
+    }
+
+    def __init__(self, request_cloud_scraper_mobile: bool, request_cloud_scraper_desktop: bool, start_date: str, end_date: str | None = None, stock_type: str | None = None, max_concurrency: int | str | None = None) -> None:
+        super().__init__(
+            request_cloud_scraper_mobile=request_cloud_scraper_mobile,
+            request_cloud_scraper_desktop=request_cloud_scraper_desktop,
+            max_concurrency=max_concurrency,
+        )
+
+        self.start_date = date.fromisoformat(start_date)
+        self.end_date = date.today() if end_date is None else date.fromisoformat(end_date)
+        if self.start_date > self.end_date:
+            raise ValueError(f"Expect {start_date=} <= {end_date=}")
+
+        # Both markets unless one is given
+        self.stock_types = tuple(self.PARSERS) if stock_type in (None, "both") else (StockType(stock_type),)
+        for the_stock_type in self.stock_types:
+            if the_stock_type not in self.PARSERS:
+                raise ValueError(f"Unsupported {stock_type=}")
+
+    def weekdays(self) -> list[date]:
+        dates = []
+        cur_date = self.start_date
+        while cur_date <= min(self.end_date, date.today()):
+            if cur_date.weekday() < 5:
+                dates.append(cur_date)
+            cur_date += timedelta(days=1)
+        return dates
+
+    def trading_dates(self, stock_type: StockType) -> list[date]:
+        non_trading_dates = _non_trading_dates.get(stock_type)
+        return [weekday for weekday in self.weekdays() if weekday not in non_trading_dates]
+
+    async def keys_async(self) -> list[tuple[date, StockType]]:
+        trading_dates = {stock_type: set(self.trading_dates(stock_type)) for stock_type in self.stock_types}
+        return [(weekday, stock_type) for weekday in self.weekdays() for stock_type in self.stock_types if weekday in trading_dates[stock_type]]
+
+    async def parse_key_async(self, key: tuple[date, StockType]):
+        trading_date, stock_type = key
+        parser = self.PARSERS[stock_type](self.request_cloud_scraper_mobile, self.request_cloud_scraper_desktop, trading_date.isoformat())
+
+        # Exactly this date, a day without data is not replaced by the previous working date as for a single query_date
+        response = await parser.request_async()
+        with record_circuit(response):
+            has_data = parser.handle_response(response)
+        if has_data:
+            return parser.data
+
+        logger.info(f"No {stock_type.value} price ratio for {trading_date.isoformat()}")
+        if trading_date < date.today():
+            _non_trading_dates.add(stock_type, trading_date)
+        return None
+
+    @property
+    def data(self) -> dict:
+        data: dict[str, dict[str, list]] = {}
+        for (trading_date, stock_type), rows in self._data.items():
+            data.setdefault(trading_date.isoformat(), {})[stock_type.value] = rows
+        return {
+            "data": data,
+            "errors": {f"{trading_date.isoformat()} {stock_type.value}": error for (trading_date, stock_type), error in self._errors.items()},
+        }
@@ -1,15 +1,13 @@
 import logging
 import re
-import time
 import requests
 
-from datetime import date
+from curl_cffi.requests import Response
 
+from .probe import DateProbingParser
 from .public import PriceRatio
 from ...constant import RequestMethod
 from ...exception import WrongDataFormat
-from ...lib import last_working_date_generator
-from ...parser import DataParser
 
 
 # https://www.tpex.org.tw/web/stock/aftertrading/peratio_analysis/pera.php?l=zh-tw
@@ -17,24 +15,18 @@ from ...parser import DataParser
 logger = logging.getLogger(__name__)
 
 
-class TwseOTCPriceRatioParser(DataParser):
+class TwseOTCPriceRatioParser(DateProbingParser):
 
     def __init__(self, request_cloud_scraper_mobile: bool, request_cloud_scraper_desktop: bool, query_date: str) -> None:
         super().__init__(
             request_method=RequestMethod.POST,
             request_cloud_scraper_mobile=request_cloud_scraper_mobile,
             request_cloud_scraper_desktop=request_cloud_scraper_desktop,
+            query_date=query_date,
         )
-        the_query_date = date.fromisoformat(query_date)
-        self.requested_date = the_query_date
-
-        self._last_working_date_generator = last_working_date_generator(the_query_date)
-        self._working_date = the_query_date
-        self._data: list[dict] = []
 
     @property
     def request_url(self):
-        self._working_date = next(self._last_working_date_generator)
         return f"https://www.tpex.org.tw/www/zh-tw/afterTrading/peQryDate?date={self._working_date.year}/{self._working_date.month:02}/{self._working_date.day:02}&cate=&id=&response=json"
 
     @property
@@ -80,45 +72,39 @@ class TwseOTCPriceRatioParser(DataParser):
 
         return [_create_data(row) for row in self._data]
 
-    def parse_response(self) -> None:
-        iterate_days = 14
-        for _ in range(iterate_days):
-            response = self.request()
-
-            try:
-                data = response.json()
-            except requests.exceptions.JSONDecodeError:
-                msg = f"Unable to parse response to json\n{response.text}"
-                raise RuntimeError(msg)
-
-            if "tables" not in data:
-                raise WrongDataFormat(f"No 'tables' key for {response.url}. Got\n{data}")
-            if len(data["tables"]) == 0:
-                raise WrongDataFormat(f"'tables' should be at least 1 item for {response.url}. Got\n{data}")
-            
-            table_item = data["tables"][0]
-
-            fields = table_item.get("fields")
-            if fields is None:
-                raise WrongDataFormat(f"No 'fields' key for {response.url}. Got\n{table_item}")
-            logger.warning(f"Fields {fields}")
-
-            if "data" not in table_item:
-                raise WrongDataFormat(f"No 'data' key for in table item for {response.url}. Got\n{data}")
-
-            if data := table_item["data"]:
-                for row in data:
-                    if len(row) != len(fields):
-                        raise WrongDataFormat(f"Data length not equal to fields length for {response.url} for\n{row}\nGot\n{data}")
-                    
-                self._data = [
-                    {
-                        field: value
-                        for field, value in zip(fields, row_data, strict=True)
-                    }
-                    for row_data in data
-                ]
-                return
-            logger.warning(f"No data for {self._working_date.isoformat()}, try previous working date")
-            time.sleep(1.12)
-        raise WrongDataFormat(f"No data found for {iterate_days} consecutive working days before {self.requested_date.isoformat()}")
+    def handle_response(self, response: Response) -> bool:
+        try:
+            data = response.json()
+        except requests.exceptions.JSONDecodeError:
+            msg = f"Unable to parse response to json\n{response.text}"
+            raise RuntimeError(msg)
+
+        if "tables" not in data:
+            raise WrongDataFormat(f"No 'tables' key for {response.url}. Got\n{data}")
+        if len(data["tables"]) == 0:
+            raise WrongDataFormat(f"'tables' should be at least 1 item for {response.url}. Got\n{data}")
+        
+        table_item = data["tables"][0]
+
+        fields = table_item.get("fields")
+        if fields is None:
+            raise WrongDataFormat(f"No 'fields' key for {response.url}. Got\n{table_item}")
+        logger.warning(f"Fields {fields}")
+
+        if "data" not in table_item:
+            raise WrongDataFormat(f"No 'data' key for in table item for {response.url}. Got\n{data}")
+
+        if data := table_item["data"]:
+            for row in data:
+                if len(row) != len(fields):
+                    raise WrongDataFormat(f"Data length not equal to fields length for {response.url} for\n{row}\nGot\n{data}")
+                
+            self._data = [
+                {
+                    field: value
+                    for field, value in zip(fields, row_data, strict=True)
+                }
+                for row_data in data
+            ]
+            return True
+        return False
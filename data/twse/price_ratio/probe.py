@@ -0,0 +1,97 @@
+import asyncio
+import itertools
+import logging
+
+from datetime import date
+
+from ...exception import WrongDataFormat
+from ...lib import last_working_date_generator
+from ...parser import DataParser
+from ...parser.circuit_breaker import record_circuit
+from ...parser.hedge import get_hedge_policy
+from ...parser.loop import run
+from ...parser.session import get_host
+
+
+logger = logging.getLogger(__name__)
+
+
+class DateProbingParser(DataParser):
+
+    # Working days before the query date to look for data, e.g. over a long holiday
+    probe_days = 14
+    # Candidate dates in flight at most, newest first
+    probe_concurrency = 3
+
+    def __init__(self, request_cloud_scraper_mobile: bool, request_cloud_scraper_desktop: bool, request_method, query_date: str) -> None:
+        super().__init__(
+            request_method=request_method,
+            request_cloud_scraper_mobile=request_cloud_scraper_mobile,
+            request_cloud_scraper_desktop=request_cloud_scraper_desktop,
+        )
+        self.requested_date = date.fromisoformat(query_date)
+
+        # The date requested by request_url, the query date or the last working date before it
+        self._working_date = next(last_working_date_generator(self.requested_date))
+        self._data: list[dict] = []
+
+    def candidate_dates(self) -> list[date]:
+        return list(itertools.islice(last_working_date_generator(self.requested_date), self.probe_days))
+
+    def create_probe(self, candidate_date: date) -> "DateProbingParser":
+        return type(self)(self.request_cloud_scraper_mobile, self.request_cloud_scraper_desktop, candidate_date.isoformat())
+
+    async def _probe(self, probe: "DateProbingParser") -> bool:
+        response = await probe.request_async()
+        with record_circuit(response):
+            return probe.handle_response(response)
+
+    def parse_response(self) -> None:
+        run(self.parse_response_async())
+
+    async def parse_response_async(self) -> None:
+        candidates = iter(self.candidate_dates())
+        host = get_host(self.request_url)
+        hedge_policy = get_hedge_policy(host, enabled=True)
+
+        # Probes in flight, newest first
+        running: list[tuple[DateProbingParser, asyncio.Task]] = []
+
+        def _start_next() -> None:
+            if len(running) < self.probe_concurrency and (candidate := next(candidates, None)) is not None:
+                probe = self.create_probe(candidate)
+                running.append((probe, asyncio.create_task(self._probe(probe))))
+
+        # The newest candidate alone at first. The previous one starts once it answers without
+        # data, or in parallel once it is slower than the host usually is.
+        _start_next()
+        try:
+            while running:
+                hedging = hedge_policy is not None and len(running) < self.probe_concurrency
+                done, _ = await asyncio.wait(
+                    [task for _, task in running if not task.done()],
+                    timeout=hedge_policy.delay(host) if hedging else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    logger.info(f"No answer for {running[0][0]._working_date.isoformat()} yet, probe an older date too")
+                    _start_next()
+                    continue
+
+                # Answers are taken newest first, an older date with data waits for the newer ones
+                while running and running[0][1].done():
+                    probe, task = running.pop(0)
+                    self.timings.extend(probe.timings)
+                    if task.result():
+                        self._working_date = probe._working_date
+                        self._data = probe._data
+                        return
+                    logger.warning(f"No data for {probe._working_date.isoformat()}, try previous working date")
+                    _start_next()
+        finally:
+            tasks = [task for _, task in running]
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.wait(tasks)
+        raise WrongDataFormat(f"No data found for {self.probe_days} consecutive working days before {self.requested_date.isoformat()}")
@@ -4,12 +4,12 @@ import time
 import requests
 
 from collections import namedtuple
-from datetime import date
 
+from curl_cffi.requests import Response
+
+from .probe import DateProbingParser
 from ...constant import RequestMethod
-from ...exception import WebsiteMaintaince, WrongDataFormat
-from ...lib import last_working_date_generator
-from ...parser import DataParser
+from ...exception import InvalidQuery, WebsiteMaintaince, WrongDataFormat
 
 
 # https://www.twse.com.tw/zh/page/trading/exchange/BWIBBU_d.html
@@ -33,24 +33,18 @@ PriceRatio = namedtuple("PriceRatio", [
 )
 
 
-class TwsePublicPriceRatioParser(DataParser):
+class TwsePublicPriceRatioParser(DateProbingParser):
 
     def __init__(self, request_cloud_scraper_mobile: bool, request_cloud_scraper_desktop: bool, query_date: str) -> None:
         super().__init__(
             request_method=RequestMethod.POST,
             request_cloud_scraper_mobile=request_cloud_scraper_mobile,
             request_cloud_scraper_desktop=request_cloud_scraper_desktop,
+            query_date=query_date,
         )
-        the_query_date = date.fromisoformat(query_date)
-        self.requested_date = the_query_date
-
-        self._last_working_date_generator = last_working_date_generator(the_query_date)
-        self._working_date = the_query_date
-        self._data: list[dict] = []
 
     @property
     def request_url(self):
-        self._working_date = next(self._last_working_date_generator)
         cur_timestamp = int((time.time() - 1000) * 1000) # Minus 1000 to avoid querying time greater than current time
         logger.warning(f"Querying price ratio for working date {self._working_date.isoformat()}")
         return f"https://www.twse.com.tw/exchangeReport/BWIBBU_d?response=json&date={self._working_date.year}{self._working_date.month:02}{self._working_date.day:02}&selectType=ALL&_={cur_timestamp}"
@@ -98,55 +92,49 @@ class TwsePublicPriceRatioParser(DataParser):
 
         return [_create_data(row) for row in self._data]
 
-    def parse_response(self) -> None:
-        iterate_days = 14
-        for _ in range(iterate_days):
-            response = self.request()
-            if response.status_code == 404:
-                raise WebsiteMaintaince(f"Maybe maintaince try again later for {response.url}")
-
-            try:
-                data = response.json()
-            except requests.exceptions.JSONDecodeError:
-                msg = f"Unable to parse response to json\n{response.text}"
-                raise RuntimeError(msg)
-
-            if data.get("stat") == "OK":
-                if title := data.get("title"):
-                    logger.info(f"Title '{title}'")
-                else:
-                    raise WrongDataFormat(f"No 'title' key for {response.url}. Got\n{data}")
+    def handle_response(self, response: Response) -> bool:
+        if response.status_code == 404:
+            raise WebsiteMaintaince(f"Maybe maintaince try again later for {response.url}")
 
-                raw_data = data.get("data")
-                if raw_data is None:
-                    raise WrongDataFormat(f"No 'data' key for {response.url}. Got\n{data}")
-                
-                fields = data.get("fields")
-                if fields is None:
-                    raise WrongDataFormat(f"No 'fields' key for {response.url}. Got\n{data}")
-                logger.warning(f"Fields {fields}")
-
-                for row in raw_data:
-                    if len(row) != len(fields):
-                        raise WrongDataFormat(f"Data length not equal to fields length for {response.url} for\n{row}\nGot\n{data}")
-                    
-                self._data = [
-                    {
-                        field: value
-                        for field, value in zip(fields, row_data, strict=True)
-                    }
-                    for row_data in raw_data
-                ]
-                return
-
-            elif data.get("stat") == "很抱歉，沒有符合條件的資料!":
-                pass
-            elif data.get("stat") == "查詢日期大於今日，請重新查詢!":
-                msg = f"Weird response, query date {self._working_date} is greater than today. Please check the date. Got\n{data}"
-                raise WebsiteMaintaince(msg)
+        try:
+            data = response.json()
+        except requests.exceptions.JSONDecodeError:
+            msg = f"Unable to parse response to json\n{response.text}"
+            raise RuntimeError(msg)
+
+        if data.get("stat") == "OK":
+            if title := data.get("title"):
+                logger.info(f"Title '{title}'")
             else:
-                raise WrongDataFormat(f"Invalid value for 'stat' key or no 'stat' key for {response.url}. Got\n{data}")
+                raise WrongDataFormat(f"No 'title' key for {response.url}. Got\n{data}")
+
+            raw_data = data.get("data")
+            if raw_data is None:
+                raise WrongDataFormat(f"No 'data' key for {response.url}. Got\n{data}")
             
-            logger.warning(f"No data for {self._working_date.isoformat()}, try previous working date")
-            time.sleep(1.32)
-        raise WrongDataFormat(f"No data found for {iterate_days} consecutive working days before {self.requested_date.isoformat()}")
+            fields = data.get("fields")
+            if fields is None:
+                raise WrongDataFormat(f"No 'fields' key for {response.url}. Got\n{data}")
+            logger.warning(f"Fields {fields}")
+
+            for row in raw_data:
+                if len(row) != len(fields):
+                    raise WrongDataFormat(f"Data length not equal to fields length for {response.url} for\n{row}\nGot\n{data}")
+                
+            self._data = [
+                {
+                    field: value
+                    for field, value in zip(fields, row_data, strict=True)
+                }
+                for row_data in raw_data
+            ]
+            return True
+
+        elif data.get("stat") == "很抱歉，沒有符合條件的資料!":
+            return False
+        elif data.get("stat") == "查詢日期大於今日，請重新查詢!":
+            # A mistake in the query, not the website being down
+            msg = f"Query date {self._working_date} is greater than today. Please check the date. Got\n{data}"
+            raise InvalidQuery(msg)
+        else:
+            raise WrongDataFormat(f"Invalid value for 'stat' key or no 'stat' key for {response.url}. Got\n{data}")
@@ -0,0 +1,45 @@
+import logging
+
+from . import RedirectFanOutParser, RedirectOldParser
+from .period_range import PeriodRange
+from ..constant import StockType
+
+
+logger = logging.getLogger(__name__)
+
+
+class TwseQuarterRangeParser(RedirectFanOutParser):
+
+    # The RedirectOldParser of one (year, stock_type, quarter)
+    PARSER: type[RedirectOldParser] = None
+
+    def __init__(self, request_cloud_scraper_mobile: bool, request_cloud_scraper_desktop: bool, start_year: int, start_quarter: int, end_year: int | None = None, end_quarter: int | None = None, stock_types: list[str] | str | None = None, timeout: str | None = None, max_concurrency: int | str | None = None) -> None:
+        super().__init__(
+            request_cloud_scraper_mobile=request_cloud_scraper_mobile,
+            request_cloud_scraper_desktop=request_cloud_scraper_desktop,
+            max_concurrency=max_concurrency,
+        )
+
+        self.range = PeriodRange("quarter", 4, start_year, start_quarter, end_year, end_quarter, stock_types)
+        self.stock_types = self.range.stock_types
+        self.timeout = timeout
+
+    def quarters(self) -> list[tuple[int, int]]:
+        return self.range.periods()
+
+    async def keys_async(self) -> list[tuple[int, int, StockType]]:
+        return self.range.keys()
+
+    def create_parser(self, key: tuple[int, int, StockType]) -> RedirectOldParser:
+        year, quarter, stock_type = key
+        return self.PARSER(self.request_cloud_scraper_mobile, self.request_cloud_scraper_desktop, year, stock_type.value, quarter, self.timeout)
+
+    @property
+    def data(self) -> dict:
+        data: dict[str, dict[str, list]] = {}
+        for (year, quarter, stock_type), rows in self._data.items():
+            data.setdefault(f"{year}Q{quarter}", {})[stock_type.value] = rows
+        return {
+            "data": data,
+            "errors": {f"{year}Q{quarter} {stock_type.value}": error for (year, quarter, stock_type), error in self._errors.items()},
+        }
@@ -1,19 +1,51 @@
 
+import codecs
+import collections
 import csv
+import logging
 
 from datetime import date
 
+from curl_cffi.requests import Response
+
+from .period_range import PeriodRange
 from ..constant import StockType, RequestMethod
 from ..exception import WrongDataFormat
 from ..parser import DataParser
+from ..parser.fan_out import FanOutParser, fan_out_or_single
 
 
 # https://mops.twse.com.tw/mops/#/web/t21sc04_ifrs
 
+logger = logging.getLogger(__name__)
+
+
+class _Lines:
+    # Lines fed so far for csv.reader, which asks for more on the next read once this runs dry
+
+    def __init__(self) -> None:
+        self._lines: collections.deque[str] = collections.deque()
+
+    def extend(self, lines: list[str]) -> None:
+        self._lines.extend(lines)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self._lines:
+            raise StopIteration
+        return self._lines.popleft()
+
 
 class TwseRevenueParser(DataParser):
 
-    def __init__(self, request_cloud_scraper_mobile: bool, request_cloud_scraper_desktop: bool, stock_type: str, year: int, month: int, timeout: int) -> None:
+    revalidate_attributes = ("_data",)
+    stream_response = True
+
+    COLUMN_SIZE = 14
+
+    def __init__(self, request_cloud_scraper_mobile: bool, request_cloud_scraper_desktop: bool, stock_type: str, year: int, month: int, timeout: str | None = None) -> None:
         super().__init__(
             request_method=RequestMethod.POST,
             request_cloud_scraper_mobile=request_cloud_scraper_mobile,
@@ -21,11 +53,17 @@ class TwseRevenueParser(DataParser):
         )
 
         self.stock_type = StockType(stock_type)
-        self.year = year
-        self.month = month
-        self.timeout = timeout
+        self.year = int(year)
+        self.month = int(month)
+        self.timeout = int(timeout) if timeout else 180
+
+        self._data: list[dict] = []
 
-        self._data: list[dict] = None
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._pending = ""
+        self._lines = _Lines()
+        self._reader = csv.reader(self._lines)
+        self._columns: dict[str, int] | None = None
 
     @property
     def request_url(self):
@@ -49,7 +87,57 @@ class TwseRevenueParser(DataParser):
         }
 
     @property
-    def data(self) -> dict:
+    def data(self) -> list[dict]:
+        return self._data
+
+    def handle_response(self, response: Response) -> None:
+        response.raise_for_status()
+        self.handle_response_chunk(response, response.content)
+        self.handle_response_end(response)
+
+    def handle_response_chunk(self, response: Response, chunk: bytes) -> None:
+        # Only complete records go to the csv reader, the rest waits for the next chunk.
+        # An odd number of quotes means the last line break is inside a quoted field.
+        text = self._pending + self._decoder.decode(chunk)
+        cut = text.rfind("\n") + 1
+        if text.count('"', 0, cut) % 2:
+            self._pending = text
+            return
+        self._pending = text[cut:]
+        self._read_lines(text[:cut])
+
+    def handle_response_end(self, response: Response) -> None:
+        self._read_lines(self._pending + self._decoder.decode(b"", final=True))
+        self._pending = ""
+        if self._columns is None:
+            # Nothing published yet, no rows as before streaming
+            logger.warning(f"Empty csv for {self.year=} {self.month=} {self.stock_type=}")
+
+    def _read_lines(self, text: str) -> None:
+        self._lines.extend(text.splitlines(keepends=True))
+        try:
+            for row in self._reader:
+                self._read_row(row)
+        except csv.Error as e:
+            raise WrongDataFormat(f"Unable to parse csv for {self.year=} {self.month=} {self.stock_type=} =====\n{text}\n=====") from e
+
+    def _read_row(self, row: list[str]) -> None:
+        if len(row) != self.COLUMN_SIZE:
+            raise WrongDataFormat(f"Expect {self.COLUMN_SIZE} columns. Got {len(row)}\n{row}")
+
+        if self._columns is None:
+            self._columns = {header: index for index, header in enumerate(row)}
+            return
+
+        self._data.append(self._create_data(row))
+
+    def _create_data(self, row: list[str]) -> dict:
+        def _get(header: str) -> str:
+            try:
+                return row[self._columns[header]]
+            except KeyError as e:
+                raise WrongDataFormat(f"Missing column {header} in {list(self._columns)}") from e
+
         def _parse_date(time: str):
             tw_year, month, day = time.split("/")
             return date(year=int(tw_year) + 1911, month=int(month), day=int(day))
@@ -71,54 +159,61 @@ class TwseRevenueParser(DataParser):
             if value in {"-", ""}:
                 return
             return value
-        
-        for data in self._data:
-            _parse_year_month(data["資料年月"])
-
-        return [
-            {
-                "stock_id": data["公司代號"],
-                "stock_name": data["公司名稱"],
-                "create_time": _parse_date(data["出表日期"]).isoformat(),
-                "year": self.year, 
-                "month": self.month,
-                "value": _parse_value(data["營業收入-當月營收"]),
-                "last_month": _parse_value(data["營業收入-上月營收"]),
-                "last_year": _parse_value(data["營業收入-去年當月營收"]),
-                "last_month_percent": _parse_percent(data["營業收入-上月比較增減(%)"]),
-                "last_year_percent": _parse_percent(data["營業收入-去年同月增減(%)"]),
-                "accumulation": _parse_value(data["累計營業收入-當月累計營收"]),
-                "last_year_accumulation": _parse_value(data["累計營業收入-去年累計營收"]),
-                "last_year_accumulation_percent": _parse_percent(data["累計營業收入-前期比較增減(%)"]),
-                "note": None if data["備註"] == "-" else data["備註"],
-            }
-            for data in self._data
-        ]
-
-    def parse_response(self) -> None:
-        response = self.request()
 
-        response.raise_for_status()
-        content = response.content.decode("utf-8-sig").splitlines()
+        # A file of another month fails on its first row
+        _parse_year_month(_get("資料年月"))
+
+        note = _get("備註")
+        return {
+            "stock_id": _get("公司代號"),
+            "stock_name": _get("公司名稱"),
+            "create_time": _parse_date(_get("出表日期")).isoformat(),
+            "year": self.year, 
+            "month": self.month,
+            "value": _parse_value(_get("營業收入-當月營收")),
+            "last_month": _parse_value(_get("營業收入-上月營收")),
+            "last_year": _parse_value(_get("營業收入-去年當月營收")),
+            "last_month_percent": _parse_percent(_get("營業收入-上月比較增減(%)")),
+            "last_year_percent": _parse_percent(_get("營業收入-去年同月增減(%)")),
+            "accumulation": _parse_value(_get("累計營業收入-當月累計營收")),
+            "last_year_accumulation": _parse_value(_get("累計營業收入-去年累計營收")),
+            "last_year_accumulation_percent": _parse_percent(_get("累計營業收入-前期比較增減(%)")),
+            "note": None if note == "-" else note,
+        }
+
+
+class TwseRevenueRangeParser(FanOutParser):
+
+    def __init__(self, request_cloud_scraper_mobile: bool, request_cloud_scraper_desktop: bool, start_year: int, start_month: int, end_year: int | None = None, end_month: int | None = None, stock_types: list[str] | str | None = None, timeout: str | None = None, max_concurrency: int | str | None = None) -> None:
+        super().__init__(
+            request_cloud_scraper_mobile=request_cloud_scraper_mobile,
+            request_cloud_scraper_desktop=request_cloud_scraper_desktop,
+            max_concurrency=max_concurrency,
+        )
+
+        self.range = PeriodRange("month", 12, start_year, start_month, end_year, end_month, stock_types)
+        self.stock_types = self.range.stock_types
+        self.timeout = timeout
+
+    def months(self) -> list[tuple[int, int]]:
+        return self.range.periods()
+
+    async def keys_async(self) -> list[tuple[int, int, StockType]]:
+        return self.range.keys()
+
+    def create_parser(self, key: tuple[int, int, StockType]) -> TwseRevenueParser:
+        year, month, stock_type = key
+        return TwseRevenueParser(self.request_cloud_scraper_mobile, self.request_cloud_scraper_desktop, stock_type.value, year, month, self.timeout)
+
+    @property
+    def data(self) -> dict:
+        data: dict[str, dict[str, list]] = {}
+        for (year, month, stock_type), rows in self._data.items():
+            data.setdefault(f"{year}-{month:02d}", {})[stock_type.value] = rows
+        return {
+            "data": data,
+            "errors": {f"{year}-{month:02d} {stock_type.value}": error for (year, month, stock_type), error in self._errors.items()},
+        }
 
-        data = []
-        hearders = None
-        try:
-            reader = csv.reader(content)
-        except Exception as e:
-            raise WrongDataFormat(f"Unable to parse csv for {self.year=} {self.month=} {self.stock_type=}\n{content}") from e
-        
-        try:
-            for row in reader:
-                if len(row) != 14:
-                    raise WrongDataFormat(f"Expect 14 columns. Got {len(row)}\n{row}\ncontent\n{content}")
-                
-                if hearders is None:
-                    hearders = row
-                    continue
-
-                data.append({header: value for header, value in zip(hearders, row)})
-        except csv.Error as e:
-            raise WrongDataFormat(f"Unable to parse csv =====\n{content}\n=====") from e
 
-        self._data = data
+parser = fan_out_or_single(TwseRevenueRangeParser, TwseRevenueParser, "start_year")
@@ -3,7 +3,9 @@ import enum
 
 from datetime import datetime
 
-from . import RedirectOldParser, TwseHTMLTableParser
+from . import RedirectFanOutParser, RedirectOldParser, TwseHTMLTableParser
+from .period_range import parse_stock_types
+from ..parser.fan_out import fan_out_or_single
 from ..parser.html_parser import DataParser
 from ..constant import StockType, RequestMethod
 
@@ -46,7 +48,33 @@ class TwseStockParser(RedirectOldParser):
     
     def get_internal_parser(self, url: str) -> DataParser:
         return _TwseStockHTMLParser(self.request_cloud_scraper_mobile, self.request_cloud_scraper_desktop, self.stock_type, url, self.timeout)
-        
+
+
+class TwseStocksParser(RedirectFanOutParser):
+
+    def __init__(self, request_cloud_scraper_mobile: bool, request_cloud_scraper_desktop: bool, stock_types: list[str] | str | None = None, timeout: str | None = None, max_concurrency: int | str | None = None) -> None:
+        super().__init__(
+            request_cloud_scraper_mobile=request_cloud_scraper_mobile,
+            request_cloud_scraper_desktop=request_cloud_scraper_desktop,
+            max_concurrency=max_concurrency,
+        )
+
+        self.stock_types = parse_stock_types(stock_types)
+        self.timeout = timeout
+
+    async def keys_async(self) -> list[StockType]:
+        return list(self.stock_types)
+
+    def create_parser(self, key: StockType) -> RedirectOldParser:
+        return TwseStockParser(self.request_cloud_scraper_mobile, self.request_cloud_scraper_desktop, key.value, self.timeout)
+
+    @property
+    def data(self) -> dict:
+        return {
+            "data": {stock_type.value: rows for stock_type, rows in self._data.items()},
+            "errors": {stock_type.value: error for stock_type, error in self._errors.items()},
+        }
+
 
 class FinancialReportType(enum.Enum):
     INDIVIDUAL = "個別"
@@ -134,3 +162,6 @@ class _TwseStockHTMLParser(TwseHTMLTableParser):
             }
             for raw_data in self._data
         ]
+
+
+parser = fan_out_or_single(TwseStocksParser, TwseStockParser, "stock_types")
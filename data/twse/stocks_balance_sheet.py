@@ -1,6 +1,8 @@
 from collections import namedtuple
 
 from . import RedirectOldParser, TwseHTMLTableParser
+from .quarter_range import TwseQuarterRangeParser
+from ..parser.fan_out import fan_out_or_single
 from ..parser.html_parser import DataParser
 from ..constant import StockType, RequestMethod
 
@@ -41,13 +43,21 @@ class TwseStocksBalanceSheetParser(RedirectOldParser):
                 }
             },
             "timeout": int(self.timeout),
-            "impersonate": "chrome110",
+            "impersonate": "chrome110", # Preferred identity, a hint to identity_manager
         }
     
     def get_internal_parser(self, url: str) -> DataParser:
         return _TwseStocksBalanceSheetHTMLParser(self.request_cloud_scraper_mobile, self.request_cloud_scraper_desktop, self.stock_type, self.year, self.quarter, url, self.timeout)
 
 
+class TwseStocksBalanceSheetRangeParser(TwseQuarterRangeParser):
+
+    PARSER = TwseStocksBalanceSheetParser
+
+
+parser = fan_out_or_single(TwseStocksBalanceSheetRangeParser, TwseStocksBalanceSheetParser, "start_year")
+
+
 class _TwseStocksBalanceSheetHTMLParser(TwseHTMLTableParser):
 
     def __init__(self, request_cloud_scraper_mobile: bool, request_cloud_scraper_desktop: bool, stock_type: StockType, year: int, quarter: int, url: str, timeout: str | None = None) -> None:
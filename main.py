@@ -2,27 +2,62 @@ import traceback
 import logging
 import sys
 
-from data import get
+from data import get, get_batch
 
 
 logging.basicConfig(level=logging.INFO, handlers=[logging.StreamHandler(sys.stdout)])
 
 
+# Seconds kept to return the result before Lambda kills the invocation
+DEADLINE_MARGIN = 1.0
+
+
+def _error_result(e: Exception) -> dict:
+    return {
+        "exception_type": str(type(e)),
+        "exception_message": str(e),
+        "traceback" : "".join(traceback.format_exception(e)),
+        "retry_after": getattr(e, "retry_after", None),
+    }
+
+
 def handler(event=None, context=None):
+    metadata = None
     try:
-        data = get(**event)
-        return {
-            "status": True,
-            "result": {
-                "data": data,
-            },
-        }
+        kw = dict(event)
+        if context is not None:
+            time_budget = context.get_remaining_time_in_millis() / 1000 - DEADLINE_MARGIN
+            if kw.get("time_budget") is not None:
+                time_budget = min(time_budget, float(kw["time_budget"]))
+            kw["time_budget"] = time_budget
+        # Opt-in, returns the network timing of every request
+        metadata = {} if kw.pop("metadata", False) else None
+
+        if "requests" in kw:
+            # Batch of sub-requests, the other keys of the event apply to all of them
+            results = get_batch(metadata=metadata, **kw)
+            result = {
+                "status": True,
+                "result": {
+                    "items": [
+                        {"status": True, "result": {"data": item.data}} if item.exception is None else {"status": False, "result": _error_result(item.exception)}
+                        for item in results
+                    ],
+                },
+            }
+        else:
+            data = get(metadata=metadata, **kw)
+            result = {
+                "status": True,
+                "result": {
+                    "data": data,
+                },
+            }
     except Exception as e:
-        return {
+        result = {
             "status": False,
-            "result": {
-                "exception_type": str(type(e)),
-                "exception_message": str(e),
-                "traceback" : traceback.format_exc(),
-            },
-        }        
+            "result": _error_result(e),
+        }
+    if metadata is not None:
+        result["metadata"] = metadata
+    return result
@@ -0,0 +1,33 @@
+import inspect
+
+import pytest
+
+from curl_cffi import requests as curl_requests
+
+from data.parser import parser as data_parser
+
+
+def _response(url: str, content: bytes) -> curl_requests.Response:
+    response = curl_requests.Response()
+    response.url = url
+    response.content = content
+    return response
+
+
+@pytest.fixture
+def stub_transport(monkeypatch):
+    # Records and answers each request with the body returned, or awaited, from answer(url, request_kw), which may raise instead
+    def _stub(answer) -> list[tuple[str, dict]]:
+        requested = []
+
+        async def _request_async(url, method, mobile, desktop, **request_kw):
+            requested.append((url, request_kw))
+            content = answer(url, request_kw)
+            if inspect.isawaitable(content):
+                content = await content
+            return _response(url, content)
+
+        monkeypatch.setattr(data_parser, "request_async", _request_async)
+        return requested
+
+    return _stub
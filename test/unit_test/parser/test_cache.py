@@ -0,0 +1,43 @@
+from types import SimpleNamespace
+
+from data.constant import RequestMethod
+from data.parser.cache import ValidatorCache, conditional_headers
+
+
+def _response(headers: dict):
+    return SimpleNamespace(headers=headers)
+
+
+def test_key_depends_on_body():
+    url = "https://mopsov.twse.com.tw/server-java/FileDownLoad"
+
+    key1 = ValidatorCache.key(RequestMethod.POST, url, {"data": {"fileName": "t21sc03_113_1.csv"}, "timeout": 60})
+    key2 = ValidatorCache.key(RequestMethod.POST, url, {"data": {"fileName": "t21sc03_113_2.csv"}, "timeout": 60})
+    key3 = ValidatorCache.key(RequestMethod.POST, url, {"data": {"fileName": "t21sc03_113_1.csv"}, "timeout": 180})
+
+    assert key1 != key2
+    assert key1 == key3
+
+
+def test_store_and_conditional_headers():
+    cache = ValidatorCache()
+
+    cache.store("a", _response({"ETag": '"v1"', "Last-Modified": "Wed, 01 Oct 2025 00:00:00 GMT"}), {"_data": [1]})
+    cache.store("b", _response({}), {"_data": [2]})
+
+    assert conditional_headers(cache.get("a")) == {"If-None-Match": '"v1"', "If-Modified-Since": "Wed, 01 Oct 2025 00:00:00 GMT"}
+    assert cache.get("a").state == {"_data": [1]}
+    assert cache.get("b") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ValidatorCache(max_entries=2)
+
+    cache.store("a", _response({"ETag": "a"}), {})
+    cache.store("b", _response({"ETag": "b"}), {})
+    cache.get("a")
+    cache.store("c", _response({"ETag": "c"}), {})
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
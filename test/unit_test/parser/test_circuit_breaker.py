@@ -0,0 +1,73 @@
+import pytest
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from data.exception import CircuitOpenError, InvalidQuery, WebsiteMaintaince
+from data.parser.circuit_breaker import CircuitBreaker, CircuitState, configure_circuit_breaker, get_circuit_breaker, record_circuit, reset_circuit_breakers
+
+
+def test_circuit_opens_after_failures_and_fails_fast():
+    with patch("data.parser.circuit_breaker.time.monotonic") as mock_monotonic:
+        mock_monotonic.return_value = 100.0
+        breaker = CircuitBreaker("mops.twse.com.tw", failure_threshold=2, cool_down=60)
+
+        breaker.record_failure()
+        breaker.before_request()
+        breaker.record_failure()
+        assert breaker.state is CircuitState.OPEN
+
+        mock_monotonic.return_value = 110.0
+        with pytest.raises(CircuitOpenError) as e:
+            breaker.before_request()
+        assert e.value.host == "mops.twse.com.tw"
+        assert e.value.retry_after == pytest.approx(50)
+
+
+def test_circuit_half_open_lets_one_probe_through():
+    with patch("data.parser.circuit_breaker.time.monotonic") as mock_monotonic:
+        mock_monotonic.return_value = 100.0
+        breaker = CircuitBreaker("mops.twse.com.tw", failure_threshold=1, cool_down=60)
+        breaker.record_failure()
+
+        mock_monotonic.return_value = 160.0
+        assert breaker.state is CircuitState.HALF_OPEN
+        breaker.before_request()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request()
+
+        # Failed probe opens the circuit for another cool-down
+        breaker.record_failure()
+        assert breaker.state is CircuitState.OPEN
+
+        mock_monotonic.return_value = 220.0
+        breaker.before_request()
+        breaker.record_success()
+        assert breaker.state is CircuitState.CLOSED
+        breaker.before_request()
+
+
+def test_failures_recorded_for_the_host_which_answered():
+    reset_circuit_breakers()
+    configure_circuit_breaker("www.twse.com.tw", failure_threshold=2)
+    response = SimpleNamespace(url="https://www.twse.com.tw/exchangeReport/BWIBBU_d?date=20250102")
+
+    for _ in range(2):
+        with pytest.raises(WebsiteMaintaince), record_circuit(response):
+            raise WebsiteMaintaince("Maybe maintaince try again later")
+
+    assert get_circuit_breaker("www.twse.com.tw").state is CircuitState.OPEN
+    assert get_circuit_breaker("www.tpex.org.tw").state is CircuitState.CLOSED
+    configure_circuit_breaker("www.twse.com.tw")
+
+
+def test_query_errors_do_not_break_the_circuit():
+    reset_circuit_breakers()
+    configure_circuit_breaker("www.twse.com.tw", failure_threshold=1)
+    response = SimpleNamespace(url="https://www.twse.com.tw/exchangeReport/BWIBBU_d?date=30000212")
+
+    with pytest.raises(InvalidQuery), record_circuit(response):
+        raise InvalidQuery("Query date 3000-02-12 is greater than today")
+
+    assert get_circuit_breaker("www.twse.com.tw").state is CircuitState.CLOSED
+    configure_circuit_breaker("www.twse.com.tw")
@@ -0,0 +1,39 @@
+import pytest
+
+from unittest.mock import patch
+
+from data.exception import DeadlineExceeded
+from data.parser.context import Invocation
+
+
+def test_no_deadline_keeps_timeouts():
+    invocation = Invocation()
+
+    assert invocation.remaining() is None
+    assert invocation.within_deadline(1000)
+    assert invocation.clamp_timeout(180) == 180
+    invocation.check_deadline()
+
+
+def test_deadline_clamps_timeouts_and_retries():
+    with patch("data.parser.context.time.monotonic") as mock_monotonic:
+        mock_monotonic.return_value = 100.0
+        invocation = Invocation(time_budget="30")
+
+        mock_monotonic.return_value = 110.0
+        assert invocation.clamp_timeout("180") == pytest.approx(20)
+        assert invocation.clamp_timeout(5) == 5
+        assert invocation.clamp_timeout(None) == pytest.approx(20)
+        # Connect and read together within what is left
+        assert invocation.clamp_timeout((5, 75)) == pytest.approx((1.25, 18.75))
+        assert invocation.clamp_timeout((3, 10)) == pytest.approx((3, 10))
+        assert invocation.within_deadline(10)
+        assert not invocation.within_deadline(25)
+
+        invocation.check_deadline(10)
+        with pytest.raises(DeadlineExceeded):
+            invocation.check_deadline(25)
+
+        mock_monotonic.return_value = 131.0
+        with pytest.raises(DeadlineExceeded):
+            invocation.check_deadline()
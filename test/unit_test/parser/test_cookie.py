@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from data.parser.cookie import CookieStore, SESSION_COOKIE_TTL, jar_key
+from data.parser.identity import Identity
+
+
+def _response(*cookies):
+    return SimpleNamespace(cookies=SimpleNamespace(jar=[
+        SimpleNamespace(name=name, value=value, domain=".twse.com.tw", path="/", expires=expires)
+        for name, value, expires in cookies
+    ]))
+
+
+def test_cookies_persisted_across_stores(tmp_path):
+    CookieStore(str(tmp_path)).save("mopsov.twse.com.tw", _response(("cf_clearance", "abc", 4102444800)))
+
+    store = CookieStore(str(tmp_path))
+
+    assert store.load("mopsov.twse.com.tw") == {"cf_clearance": "abc"}
+    assert store.load("www.twse.com.tw") == {}
+
+
+def test_memory_only_store(tmp_path):
+    store = CookieStore()
+    store.save("mopsov.twse.com.tw", _response(("cf_clearance", "abc", 4102444800)))
+
+    assert store.load("mopsov.twse.com.tw") == {"cf_clearance": "abc"}
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_expired_cookies_dropped():
+    store = CookieStore()
+    with patch("data.parser.cookie.time.time") as mock_time:
+        mock_time.return_value = 1000
+        store.save("mopsov.twse.com.tw", _response(("cf_clearance", "abc", 2000), ("__cf_bm", "xyz", None)))
+
+        assert store.load("mopsov.twse.com.tw") == {"cf_clearance": "abc", "__cf_bm": "xyz"}
+
+        mock_time.return_value = 1000 + SESSION_COOKIE_TTL
+        assert store.load("mopsov.twse.com.tw") == {}
+
+
+def test_user_agent_kept_with_the_jar(tmp_path):
+    jar = jar_key("mopsov.twse.com.tw", Identity("chrome110", "windows", False))
+    store = CookieStore(str(tmp_path))
+
+    assert store.user_agent(jar, lambda: "Chrome/110.0") == "Chrome/110.0"
+    assert store.user_agent(jar, lambda: "Chrome/136.0") == "Chrome/110.0"
+    store.save(jar, _response(("cf_clearance", "abc", 4102444800)))
+
+    # Persisted together, the clearance is replayed with the user agent which earned it
+    store = CookieStore(str(tmp_path))
+    assert store.load(jar) == {"cf_clearance": "abc"}
+    assert store.user_agent(jar, lambda: "Chrome/136.0") == "Chrome/110.0"
+    assert store.load(jar_key("mopsov.twse.com.tw", Identity("chrome", "windows", False))) == {}
@@ -0,0 +1,58 @@
+import asyncio
+
+from data.exception import WrongDataFormat
+from data.parser.fan_out import FanOutParser, fan_out_or_single
+
+
+class _FakeParser:
+
+    running = 0
+    max_running = 0
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+
+    async def parse_response_async(self) -> None:
+        _FakeParser.running += 1
+        _FakeParser.max_running = max(_FakeParser.max_running, _FakeParser.running)
+        await asyncio.sleep(0.01 if self.key == "2330" else 0)
+        _FakeParser.running -= 1
+        if self.key == "9999":
+            raise WrongDataFormat("No data")
+
+    @property
+    def data(self):
+        return [self.key]
+
+
+class _FakeFanOutParser(FanOutParser):
+
+    def __init__(self, keys: list[str], max_concurrency: int) -> None:
+        super().__init__(True, True, max_concurrency=max_concurrency)
+        self.keys = keys
+
+    async def keys_async(self) -> list[str]:
+        return self.keys
+
+    def create_parser(self, key: str) -> _FakeParser:
+        return _FakeParser(key)
+
+
+def test_fan_out_isolates_errors_and_bounds_concurrency():
+    parser = _FakeFanOutParser(["2330", "9999", "2317", "0050", "2454"], max_concurrency=2)
+
+    parser.parse_response()
+
+    assert list(parser.data["data"]) == ["2330", "2317", "0050", "2454"]
+    assert parser.data["data"]["2317"] == ["2317"]
+    assert list(parser.data["errors"]) == ["9999"]
+    assert "WrongDataFormat" in parser.data["errors"]["9999"]["exception_type"]
+    assert _FakeParser.max_running == 2
+
+
+def test_fan_out_or_single_dispatches_on_the_keyword():
+    parser = fan_out_or_single(_FakeFanOutParser, _FakeParser, "keys")
+
+    assert isinstance(parser(keys=["2330"], max_concurrency=1), _FakeFanOutParser)
+    assert isinstance(parser("2330"), _FakeParser)
+    assert isinstance(parser("2330", keys=None), _FakeParser)
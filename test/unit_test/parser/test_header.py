@@ -0,0 +1,41 @@
+import pytest
+
+from data.parser.header import HeaderProfilePool, _FALLBACK_USER_AGENTS, impersonated_browser
+
+
+def test_user_agent_respects_mobile_and_desktop():
+    pool = HeaderProfilePool(_FALLBACK_USER_AGENTS)
+
+    desktop_agents = {agent for platform in ["linux", "windows", "darwin"] for agents in _FALLBACK_USER_AGENTS["desktop"][platform].values() for agent in agents}
+    mobile_agents = {agent for platform in ["android", "ios"] for agents in _FALLBACK_USER_AGENTS["mobile"][platform].values() for agent in agents}
+
+    for _ in range(50):
+        assert pool.user_agent(mobile=False) in desktop_agents
+        assert pool.user_agent(desktop=False, browser="chrome") in mobile_agents
+        assert pool.user_agent() in desktop_agents | mobile_agents
+
+
+def test_user_agent_for_platform_and_browser():
+    pool = HeaderProfilePool(_FALLBACK_USER_AGENTS)
+
+    assert pool.user_agent(platform="linux", browser="firefox") in _FALLBACK_USER_AGENTS["desktop"]["linux"]["firefox"]
+
+
+def test_mobile_and_desktop_both_disabled():
+    pool = HeaderProfilePool(_FALLBACK_USER_AGENTS)
+
+    with pytest.raises(ValueError):
+        pool.user_agent(mobile=False, desktop=False)
+
+
+def test_user_agent_of_the_impersonated_browser():
+    pool = HeaderProfilePool(_FALLBACK_USER_AGENTS)
+
+    assert impersonated_browser("chrome110") == ("chrome", "110")
+    assert impersonated_browser("edge") == ("chrome", None)
+    assert impersonated_browser("chrome_android") == ("chrome", None)
+
+    for _ in range(20):
+        assert "Chrome/131." in pool.user_agent(platform="windows", browser="chrome", version="131")
+        # No user agent of that version in the pool, any of the browser
+        assert pool.user_agent(platform="windows", browser="chrome", version="110") in _FALLBACK_USER_AGENTS["desktop"]["windows"]["chrome"]
@@ -0,0 +1,134 @@
+import asyncio
+
+from types import SimpleNamespace
+
+from data.constant import RequestMethod
+from data.parser import parser
+from data.parser.context import Invocation, invocation_context
+from data.parser.hedge import HedgePolicy, configure_hedging, get_hedge_policy
+from data.parser.latency import LatencyTracker, latency_tracker
+from data.parser.loop import run
+
+
+def test_latency_percentile():
+    tracker = LatencyTracker(window=10, min_samples=3)
+
+    tracker.record("host", 1)
+    tracker.record("host", 2)
+    assert tracker.percentile("host", 0.9) is None
+
+    for seconds in range(3, 13):
+        tracker.record("host", seconds)
+
+    # Only the last 10 samples, 3..12, are kept
+    assert tracker.percentile("host", 0.5) == 7
+    assert tracker.percentile("host", 1) == 12
+
+
+def test_hedge_policy_is_opt_in():
+    assert get_hedge_policy("hedge.test") is None
+    assert get_hedge_policy("hedge.test", enabled=True) is not None
+
+
+def test_hedge_delay_uses_host_latency():
+    policy = HedgePolicy(percentile=0.9, min_delay=0.5, default_delay=7)
+    assert policy.delay("delay.test") == 7
+
+    for _ in range(10):
+        latency_tracker.record("delay.test", 2)
+    assert policy.delay("delay.test") == 2
+
+    latency_tracker.clear()
+
+
+def test_hedged_request_first_good_response_wins(monkeypatch):
+    configure_hedging("hedge.test", HedgePolicy(default_delay=0.05))
+
+    calls = []
+    cancelled = []
+
+    async def _request(url, method, identity, **request_kw):
+        calls.append(identity)
+        if len(calls) == 1:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(identity)
+                raise
+        return SimpleNamespace(status_code=200, queue=None, identity=identity)
+
+    monkeypatch.setattr(parser, "request_by_cloud_scraper_async", _request)
+    try:
+        with invocation_context(Invocation()):
+            response = run(parser._request_with_identities_async("https://hedge.test/", RequestMethod.GET, True, True))
+    finally:
+        configure_hedging("hedge.test", None)
+
+    assert len(calls) == 2
+    assert response.identity == calls[1]
+    assert cancelled == [calls[0]]
+
+
+class _StreamedResponse:
+
+    def __init__(self, identity) -> None:
+        self.identity = identity
+        self.status_code = 200
+        self.queue = object()
+        self.closed = False
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+def _hedged_request(monkeypatch, attempt) -> _StreamedResponse:
+    configure_hedging("hedge.test", HedgePolicy(default_delay=0.01))
+    monkeypatch.setattr(parser, "request_by_cloud_scraper_async", attempt)
+    try:
+        with invocation_context(Invocation()):
+            return run(parser._request_with_identities_async("https://hedge.test/", RequestMethod.GET, True, True))
+    finally:
+        configure_hedging("hedge.test", None)
+
+
+def test_hedged_losers_finished_together_are_closed(monkeypatch):
+    responses = []
+    gate = None
+
+    async def _attempt(url, method, identity, **request_kw):
+        nonlocal gate
+        response = _StreamedResponse(identity)
+        responses.append(response)
+        if gate is None:
+            gate = asyncio.get_running_loop().create_future()
+            await gate
+        else:
+            # The first attempt finishes in the same round
+            gate.set_result(None)
+        return response
+
+    response = _hedged_request(monkeypatch, _attempt)
+
+    assert len(responses) == 2
+    assert not response.closed
+    assert [other.closed for other in responses if other is not response] == [True]
+
+
+def test_hedged_loser_finishing_while_cancelled_is_closed(monkeypatch):
+    responses = []
+
+    async def _attempt(url, method, identity, **request_kw):
+        response = _StreamedResponse(identity)
+        responses.append(response)
+        if len(responses) == 1:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                pass # The body arrived as the cancellation did
+        return response
+
+    response = _hedged_request(monkeypatch, _attempt)
+
+    assert response is responses[1]
+    assert not response.closed
+    assert responses[0].closed
@@ -0,0 +1,88 @@
+import time
+
+from types import SimpleNamespace
+
+import pytest
+
+from curl_cffi import requests as curl_requests
+
+from data.constant import RequestMethod
+from data.exception import DeadlineExceeded
+from data.parser.context import Invocation, invocation_context
+from data.parser.html_parser import DataHTMLParser
+
+
+class _CellParser(DataHTMLParser):
+
+    response_encoding = "big5"
+
+    def __init__(self, timeout: float | None = None) -> None:
+        super().__init__(request_method=RequestMethod.GET, request_cloud_scraper_mobile=True, request_cloud_scraper_desktop=True)
+        self.timeout = timeout
+        self.cells = []
+
+    @property
+    def request_kw(self) -> dict:
+        return {"timeout": self.timeout}
+
+    def handle_data(self, data):
+        if self.is_in_tag("td"):
+            self.cells.append(data)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 1024])
+def test_streamed_chunks_split_big5_characters_and_text(chunk_size):
+    body = "<table><tr><td>台積電</td><td>現金股利 3.5</td></tr><tr><td>鴻海</td></tr></table>".encode("big5")
+    response = SimpleNamespace(encoding="utf-8", url="https://mopsov.twse.com.tw/server-java/t05st09sub")
+    parser = _CellParser()
+
+    for i in range(0, len(body), chunk_size):
+        parser.handle_response_chunk(response, body[i:i + chunk_size])
+    parser.handle_response_end(response)
+
+    assert parser.cells == ["台積電", "現金股利 3.5", "鴻海"]
+    assert parser.rawdata == ""
+    assert parser.raw_tail.endswith("<td>鴻海</td></tr></table>")
+
+
+class _TricklingResponse:
+
+    def __init__(self, chunks: list[bytes], delay: float) -> None:
+        self.chunks = chunks
+        self.delay = delay
+        self.closed = False
+
+        self.queue = object()
+        self.status_code = 200
+        self.encoding = "utf-8"
+        self.url = "https://mopsov.twse.com.tw/server-java/t05st09sub?step=1"
+
+    def iter_content(self):
+        for chunk in self.chunks:
+            yield chunk
+            time.sleep(self.delay)
+
+    def close(self):
+        self.closed = True
+
+
+def test_stream_stops_after_the_hop_timeout():
+    response = _TricklingResponse([b"<table><tr><td>a</td>"] * 10, delay=0.02)
+    parser = _CellParser(timeout=0.03)
+
+    with pytest.raises(curl_requests.exceptions.Timeout):
+        parser._handle_or_revalidate(response)
+
+    assert response.closed
+    assert len(parser.cells) < 10
+
+
+def test_stream_stops_at_the_invocation_deadline():
+    response = _TricklingResponse([b"<table><tr><td>a</td>"] * 10, delay=0.02)
+    parser = _CellParser()
+
+    with invocation_context(Invocation(time_budget=0.03)):
+        with pytest.raises(DeadlineExceeded):
+            parser._handle_or_revalidate(response)
+
+    assert response.closed
@@ -0,0 +1,52 @@
+from data.parser.identity import IdentityManager
+
+
+def test_candidates_prefer_hint():
+    manager = IdentityManager()
+
+    candidates = manager.candidates("mops.twse.com.tw", hint="chrome110")
+
+    assert candidates[0].impersonate == "chrome110"
+    assert len(candidates) == len(set(candidates))
+
+
+def test_candidates_respect_mobile_and_desktop():
+    manager = IdentityManager()
+
+    assert all(not identity.mobile for identity in manager.candidates("mops.twse.com.tw", mobile=False))
+    assert all(identity.mobile for identity in manager.candidates("mops.twse.com.tw", desktop=False))
+
+
+def test_blocked_identity_is_demoted_per_host():
+    manager = IdentityManager()
+
+    blocked = manager.candidates("mops.twse.com.tw", hint="chrome110")[0]
+    for _ in range(3):
+        manager.record("mops.twse.com.tw", blocked, False)
+
+    assert manager.candidates("mops.twse.com.tw", hint="chrome110")[0] != blocked
+    assert manager.candidates("www.twse.com.tw", hint="chrome110")[0].impersonate == "chrome110"
+
+
+def test_successful_identity_is_tried_first():
+    manager = IdentityManager()
+
+    identity = manager.candidates("www.tpex.org.tw")[-1]
+    manager.record("www.tpex.org.tw", identity, True, 0.2)
+
+    assert manager.candidates("www.tpex.org.tw")[0] == identity
+
+
+def test_working_identity_of_a_slow_host_stays_first():
+    manager = IdentityManager()
+
+    identity = manager.candidates("mopsov.twse.com.tw")[-1]
+    for _ in range(5):
+        manager.record("mopsov.twse.com.tw", identity, True, 20)
+    assert manager.candidates("mopsov.twse.com.tw")[0] == identity
+
+    other = manager.candidates("mopsov.twse.com.tw")[-1]
+    manager.record("mopsov.twse.com.tw", other, True, 5)
+    candidates = manager.candidates("mopsov.twse.com.tw")
+    # Both ahead of the untried identities, the faster one first
+    assert candidates[:2] == [other, identity]
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from unittest.mock import patch
+
+from data.exception import DeadlineExceeded
+from data.parser import rate_limit
+from data.parser.rate_limit import TokenBucket
+
+
+def test_token_bucket_waits_only_over_budget():
+    with patch("data.parser.rate_limit.time.monotonic") as mock_monotonic:
+        mock_monotonic.return_value = 100.0
+        bucket = TokenBucket(rate=2, burst=2)
+
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == pytest.approx(0.5)
+        assert bucket.reserve() == pytest.approx(1.0)
+
+        mock_monotonic.return_value = 110.0
+        assert bucket.reserve() == 0
+
+
+def test_default_host_rate_limits():
+    assert rate_limit.get_rate_limiter("www.twse.com.tw").rate == pytest.approx(1 / 1.32)
+    assert rate_limit.get_rate_limiter("ws.api.cnyes.com") is None
+
+
+def test_configure_rate_limit():
+    try:
+        rate_limit.configure_rate_limit("www.moneydj.com", 5, burst=3)
+
+        rate_limiter = rate_limit.get_rate_limiter("www.moneydj.com")
+        assert rate_limiter.rate == 5
+        assert rate_limiter.burst == 3
+    finally:
+        rate_limit.configure_rate_limit("www.moneydj.com", None)
+
+
+def test_token_refunded_when_cancelled_while_waiting():
+    bucket = TokenBucket(rate=1, burst=1)
+
+    async def _cancel_waiting():
+        assert await bucket.acquire_async() == 0
+        task = asyncio.create_task(bucket.acquire_async())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(_cancel_waiting())
+
+    # Only the token of the first acquire is spent, the next caller waits about a second instead of two
+    assert bucket.reserve() == pytest.approx(1, abs=0.1)
+
+
+def test_no_wait_past_the_deadline():
+    bucket = TokenBucket(rate=1, burst=1)
+
+    assert bucket.acquire(max_wait=0) == 0
+    with pytest.raises(DeadlineExceeded):
+        bucket.acquire(max_wait=0.5)
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(bucket.acquire_async(max_wait=0.5))
+
+    # The tokens of the refused waits are given back
+    assert bucket.reserve() == pytest.approx(1, abs=0.1)
@@ -0,0 +1,64 @@
+import pytest
+
+from curl_cffi import requests as curl_requests
+
+from data.exception import BlockingByWebsiteError, WrongDataFormat
+from data.parser.retry import RetryBudget, RetryPolicy, configure_retry_policy, get_retry_policy, _retry_policies
+
+
+def test_backoff_is_exponential_and_capped():
+    policy = RetryPolicy(backoff_base=1, backoff_max=5, jitter=0)
+
+    assert [policy.backoff(attempt) for attempt in range(5)] == [1, 2, 4, 5, 5]
+
+
+def test_backoff_jitter_range():
+    policy = RetryPolicy(backoff_base=2, backoff_max=100, jitter=0.5)
+
+    for _ in range(100):
+        assert 4 <= policy.backoff(2) <= 8
+
+
+@pytest.mark.parametrize("exception, status_code, expect_retry", [
+    (curl_requests.exceptions.Timeout("timeout"), None, True),
+    (BlockingByWebsiteError("THE PAGE CANNOT BE ACCESSED!"), None, True),
+    (WrongDataFormat("bad"), None, False),
+    (None, 503, True),
+    (None, 200, False),
+    (None, 404, False),
+])
+def test_retry_delay_retryable(exception, status_code, expect_retry):
+    policy = RetryPolicy()
+
+    delay = policy.retry_delay(0, RetryBudget(10), exception=exception, status_code=status_code)
+
+    assert (delay is not None) == expect_retry
+
+
+def test_retry_delay_max_attempts_and_budget():
+    policy = RetryPolicy(max_attempts=3)
+    budget = RetryBudget(3)
+
+    assert policy.retry_delay(0, budget, status_code=503) is not None
+    assert policy.retry_delay(1, budget, status_code=503) is not None
+    assert policy.retry_delay(2, budget, status_code=503) is None
+
+    assert policy.retry_delay(0, budget, status_code=503) is not None
+    assert policy.retry_delay(0, budget, status_code=503) is None
+
+
+def test_get_retry_policy_precedence():
+    by_data_type = RetryPolicy(max_attempts=2)
+    by_host = RetryPolicy(max_attempts=4)
+    by_both = RetryPolicy(max_attempts=5)
+    try:
+        configure_retry_policy(by_data_type, data_type="dividend")
+        configure_retry_policy(by_host, host="mopsov.twse.com.tw")
+        configure_retry_policy(by_both, data_type="dividend", host="mopsov.twse.com.tw")
+
+        assert get_retry_policy("dividend", "mopsov.twse.com.tw") is by_both
+        assert get_retry_policy("dividend", "www.twse.com.tw") is by_data_type
+        assert get_retry_policy("revenue", "mopsov.twse.com.tw") is by_host
+        assert get_retry_policy("revenue", "www.twse.com.tw").max_attempts == 3
+    finally:
+        _retry_policies.clear()
@@ -0,0 +1,33 @@
+from data.parser import session
+from data.parser.identity import Identity
+
+
+CHROME = Identity("chrome", "windows", False)
+CHROME_110 = Identity("chrome110", "windows", False)
+
+
+def test_get_session_reused_by_host_and_identity():
+    try:
+        s1 = session.get_session("https://mops.twse.com.tw/mops/api/redirectToOld", CHROME)
+        s2 = session.get_session("https://mops.twse.com.tw/server-java/t05st09sub?YEAR=113", CHROME)
+        s3 = session.get_session("https://mops.twse.com.tw/mops/api/redirectToOld", CHROME_110)
+        s4 = session.get_session("https://www.twse.com.tw/exchangeReport/BWIBBU_d", CHROME)
+        s5 = session.get_session("https://mops.twse.com.tw/mops/api/redirectToOld", Identity("chrome", "linux", False))
+
+        assert s1 is s2
+        assert s1 is not s3
+        assert s1 is not s4
+        assert s1 is not s5
+    finally:
+        session.close_sessions()
+
+
+def test_discard_session():
+    try:
+        s1 = session.get_session("https://www.tpex.org.tw/www/zh-tw/afterTrading/peQryDate", CHROME)
+        session.discard_session("https://www.tpex.org.tw/", CHROME)
+        s2 = session.get_session("https://www.tpex.org.tw/www/zh-tw/afterTrading/peQryDate", CHROME)
+
+        assert s1 is not s2
+    finally:
+        session.close_sessions()
@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+
+from unittest.mock import patch
+
+from curl_cffi import requests as curl_requests
+
+from data.constant import RequestMethod
+from data.exception import DeadlineExceeded
+from data.parser import concurrency, parser, rate_limit
+from data.parser.concurrency import host_slot
+from data.parser.context import Invocation, invocation_context
+from data.parser.identity import Identity
+from data.parser.latency import LatencyTracker, latency_tracker
+from data.parser.timeout import AdaptiveTimeout, configure_adaptive_timeout, get_endpoint, request_timeout, _adaptive_timeouts
+
+
+def test_get_endpoint_drops_query():
+    assert get_endpoint("https://www.twse.com.tw/rwd/zh/afterTrading/BWIBBU_d?date=20240101&response=json") == "www.twse.com.tw/rwd/zh/afterTrading/BWIBBU_d"
+
+
+def test_adaptive_timeout_bounds():
+    policy = AdaptiveTimeout(percentile=0.99, multiplier=3, min_timeout=5, max_timeout=60)
+    endpoint = "timeout.test/fast"
+
+    assert policy.timeout(endpoint, 180) == 180
+
+    try:
+        for _ in range(10):
+            latency_tracker.record(endpoint, 0.1)
+        assert policy.timeout(endpoint, 180) == 5
+
+        for _ in range(10):
+            latency_tracker.record(endpoint, 30)
+        assert policy.timeout(endpoint, 180) == 60
+
+        latency_tracker.record(endpoint, 10)
+        assert AdaptiveTimeout(percentile=0.5, multiplier=2, max_timeout=180).timeout(endpoint, 20) == pytest.approx(20)
+    finally:
+        latency_tracker.clear()
+
+
+def test_adaptive_timeout_can_be_disabled_per_host():
+    try:
+        for _ in range(10):
+            latency_tracker.record("timeout.test/slow", 1)
+        assert request_timeout("https://timeout.test/slow?x=1", 180) == 5
+
+        configure_adaptive_timeout(None, host="timeout.test")
+        assert request_timeout("https://timeout.test/slow?x=1", 180) == 180
+    finally:
+        latency_tracker.clear()
+        _adaptive_timeouts.clear()
+
+
+def test_latency_tracker_persists(tmp_path):
+    path = str(tmp_path / "latency.json")
+    tracker = LatencyTracker(min_samples=1, path=path)
+    tracker.record("mopsov.twse.com.tw/server-java/FileDownLoad", 12.5)
+    tracker.save()
+
+    assert LatencyTracker(min_samples=1, path=path).percentile("mopsov.twse.com.tw/server-java/FileDownLoad", 0.99) == 12.5
+
+
+def test_timeouts_widen_the_learned_timeout(monkeypatch):
+    class _TimingOutSession:
+
+        def __init__(self) -> None:
+            self.timeouts = []
+
+        def request(self, method, url, timeout=None, **kw):
+            self.timeouts.append(timeout)
+            raise curl_requests.exceptions.Timeout("Operation timed out")
+
+    session = _TimingOutSession()
+    monkeypatch.setattr(parser, "get_session", lambda url, identity: session)
+    url = "https://timeout.test/slow?x=1"
+    try:
+        for _ in range(10):
+            latency_tracker.record("timeout.test/slow", 1)
+
+        for _ in range(3):
+            with pytest.raises(curl_requests.exceptions.Timeout):
+                parser.request_by_cloud_scraper(url, RequestMethod.GET, Identity("chrome", "windows", False), timeout=180)
+
+        # The learned 5s timeout is sampled on each timeout and grows past it
+        assert session.timeouts[0] == 5
+        assert session.timeouts[1] == 15
+        assert session.timeouts[2] == 45
+    finally:
+        latency_tracker.clear()
+
+
+def test_no_request_with_less_than_the_minimum_timeout_left():
+    with patch("data.parser.context.time.monotonic") as mock_monotonic:
+        mock_monotonic.return_value = 100.0
+        invocation = Invocation(time_budget=10)
+
+        with invocation_context(invocation):
+            mock_monotonic.return_value = 105.0
+            assert parser._apply_timeout("https://timeout.test/slow", {"timeout": 180})["timeout"] == pytest.approx(5)
+
+            # A sub-millisecond timeout would reach curl as TIMEOUT_MS=0, no timeout at all
+            mock_monotonic.return_value = 109.9995
+            with pytest.raises(DeadlineExceeded):
+                parser._apply_timeout("https://timeout.test/slow", {"timeout": 180})
+
+
+def test_no_wait_for_the_rate_limit_past_the_deadline(monkeypatch):
+    requested = []
+    monkeypatch.setattr(parser, "get_session", lambda url, identity: requested.append(url))
+    rate_limit.configure_rate_limit("timeout.test", 0.1)
+    try:
+        rate_limit.get_rate_limiter("timeout.test").reserve()
+
+        # The next token comes in 10s, past the deadline
+        with invocation_context(Invocation(time_budget=5)), pytest.raises(DeadlineExceeded):
+            parser.request_by_cloud_scraper("https://timeout.test/slow", RequestMethod.GET, Identity("chrome", "windows", False), timeout=180)
+        assert requested == ["https://timeout.test/slow"]
+    finally:
+        rate_limit.configure_rate_limit("timeout.test", None)
+
+
+def test_no_wait_for_a_host_slot_past_the_deadline(monkeypatch):
+    async def _wait_for_a_busy_host():
+        async with host_slot("timeout.test"):
+            with invocation_context(Invocation(time_budget=1.2)):
+                await parser.request_by_cloud_scraper_async("https://timeout.test/slow", RequestMethod.GET, Identity("chrome", "windows", False), timeout=180)
+
+    monkeypatch.setitem(concurrency._host_concurrency, "timeout.test", 1)
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(_wait_for_a_busy_host())
@@ -0,0 +1,39 @@
+from types import SimpleNamespace
+
+from curl_cffi import CurlInfo
+
+from data.parser.timing import request_timing
+
+
+def test_request_timing_from_curl_infos():
+    response = SimpleNamespace(
+        url="https://mops.twse.com.tw/mops/api/redirectToOld",
+        status_code=200,
+        elapsed=0.5,
+        content=b"x" * 4096,
+        infos={
+            CurlInfo.NAMELOOKUP_TIME: 0.01,
+            CurlInfo.CONNECT_TIME: 0.03,
+            CurlInfo.APPCONNECT_TIME: 0.1,
+            CurlInfo.STARTTRANSFER_TIME: 0.4,
+            CurlInfo.TOTAL_TIME: 0.5,
+            CurlInfo.SIZE_DOWNLOAD_T: 1024,
+        },
+    )
+
+    timing = request_timing(response)
+
+    assert timing.appconnect == 0.1
+    assert timing.starttransfer == 0.4
+    assert timing.size_download == 1024
+    assert timing.size_decoded == 4096
+    assert timing._asdict()["url"] == response.url
+
+
+def test_request_timing_without_infos():
+    response = SimpleNamespace(url="https://www.twse.com.tw/", status_code=304, elapsed=0.2, infos={}, content=b"")
+
+    timing = request_timing(response)
+
+    assert timing.total == 0.2
+    assert timing.namelookup is None
@@ -0,0 +1,13 @@
+from data.parser.transfer import TransferCounter, TransferStats
+
+
+def test_transfer_counter_per_data_type():
+    counter = TransferCounter()
+
+    counter.record("dividend", 1000, 9000)
+    counter.record("dividend", 500, 4000)
+    counter.record("revenue", None, 300)
+
+    assert counter.get("dividend") == TransferStats(2, 1500, 13000)
+    assert counter.get("revenue") == TransferStats(1, 300, 300)
+    assert counter.get("stock") == TransferStats(0, 0, 0)
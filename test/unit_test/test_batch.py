@@ -0,0 +1,38 @@
+import asyncio
+
+import data
+
+from data.exception import WrongDataFormat
+
+
+class _FakeParser:
+
+    def __init__(self, request_cloud_scraper_mobile: bool, request_cloud_scraper_desktop: bool, value: str) -> None:
+        self.value = value
+
+    def parse_response(self) -> None:
+        raise NotImplementedError
+
+    async def parse_response_async(self) -> None:
+        await asyncio.sleep(0)
+        if self.value == "bad":
+            raise WrongDataFormat("bad")
+
+    @property
+    def data(self):
+        return {"value": self.value}
+
+
+def test_get_batch_keeps_order_and_isolates_failures(monkeypatch):
+    monkeypatch.setitem(data.PARSERS, "fake", _FakeParser)
+
+    results = data.get_batch([
+        {"data_type": "fake", "value": "a"},
+        {"data_type": "fake", "value": "bad"},
+        {"data_type": "unknown"},
+        {"data_type": "fake", "value": "b", "use_async": False},
+    ], retry_budget=0)
+
+    assert [result.data for result in results] == [{"value": "a"}, None, None, {"value": "b"}]
+    assert isinstance(results[1].exception, WrongDataFormat)
+    assert isinstance(results[2].exception, KeyError)
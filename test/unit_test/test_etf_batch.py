@@ -0,0 +1,76 @@
+import json
+
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from data.constant import ETF_Country
+from data.moneydj import etf_slice
+from data.moneydj.etf_slice import MoneydjETFSliceParser, MoneydjETFsSliceParser
+from data.pocket import etf_dividend
+from data.pocket.etf_dividend import PocketETFDividendParser, PocketETFsDividendParser
+
+
+def test_parser_dispatches_batch_mode():
+    assert isinstance(etf_slice.parser(True, True, etf_ids=["0050"], etf_country=".TW"), MoneydjETFsSliceParser)
+    assert isinstance(etf_slice.parser(True, True, etf_id="0050", etf_country=".TW"), MoneydjETFSliceParser)
+    assert isinstance(etf_dividend.parser(True, True, etf_ids=["TQQQ"], etf_country="", years="5"), PocketETFsDividendParser)
+    assert isinstance(etf_dividend.parser(True, True, etf_id="TQQQ", etf_country="", years="5"), PocketETFDividendParser)
+
+
+def test_etfs_of_mixed_countries():
+    parser = PocketETFsDividendParser(True, True, etf_ids={"0056": ".TW", "VOO": ""}, years="3")
+
+    sub_parser = parser.create_parser("VOO")
+    assert (sub_parser.etf_id, sub_parser.etf_country, sub_parser.years) == ("VOO", ETF_Country.US, 3)
+    assert parser.create_parser("0056").etf_country is ETF_Country.TW
+
+
+def test_country_required_for_a_list_of_ids():
+    with pytest.raises(ValueError):
+        MoneydjETFsSliceParser(True, True, etf_ids=["0050"])
+
+
+def _slice_page(header: list[str], rows: list[list[str]]) -> bytes:
+    rows = ["".join(f"<th>{cell}</th>" for cell in header)] + ["".join(f"<td>{cell}</td>" for cell in row) for row in rows]
+    return f"<html><table id='ctl00_ctl00_MainContent_MainContent_gvTbl'>{''.join(f'<tr>{row}</tr>' for row in rows)}</table></html>".encode("utf-8")
+
+
+def _etf_id(url: str) -> str:
+    query = parse_qs(urlsplit(url).query)
+    return query["etfid"][0] if "etfid" in query else query["ParamStr"][0].split(";")[0].removeprefix("AssignID=")
+
+
+def test_slices_keyed_by_etf_id(stub_transport):
+    bodies = {
+        "0050.TW": _slice_page(["日期", "事件", "比例"], [["2025/06/18", "分割", "1:4"]]),
+        "00631L.TW": _slice_page(["日期", "事件"], []),
+        "006208.TW": _slice_page(["日期", "事件", "比例"], [["查無資料"]]),
+    }
+    requested = stub_transport(lambda url, request_kw: bodies[_etf_id(url)])
+
+    parser = MoneydjETFsSliceParser(True, True, etf_ids=["0050", "00631L", "006208"], etf_country=".TW")
+    parser.parse_response()
+
+    assert {_etf_id(url) for url, _ in requested} == {"0050.TW", "00631L.TW", "006208.TW"}
+    assert parser.data["data"] == {"0050": [["2025/06/18", "分割", "1:4"]], "006208": []}
+    assert list(parser.data["errors"]) == ["00631L"]
+    assert "WrongDataFormat" in parser.data["errors"]["00631L"]["exception_type"]
+
+
+def test_dividends_of_mixed_countries_keyed_by_etf_id(stub_transport):
+    bodies = {
+        "VOO": json.dumps({"Title": ["年度", "現金股利(元)", "現金股利殖利率(TTM)(%)", "除息權日"], "Data": [["2024", "6.6930000000", "1.24", "20241223"]]}).encode(),
+        "0056": json.dumps({"Title": ["年季", "現金股利合計(元)", "現金股利殖利率(%)", "除息日", "發放日"], "Data": [["202502", "0.8660", "2.47", "20250716", "20250808"]]}).encode(),
+        "QQQ": b"<html>Service Unavailable</html>",
+    }
+    stub_transport(lambda url, request_kw: bodies[_etf_id(url)])
+
+    parser = PocketETFsDividendParser(True, True, etf_ids={"VOO": "", "0056": ".TW", "QQQ": ""}, years="3")
+    parser.parse_response()
+
+    data = parser.data["data"]
+    assert list(data) == ["VOO", "0056"]
+    assert (data["VOO"][0]["dividend_year"], data["VOO"][0]["dividend_quarter"], data["VOO"][0]["dividend_value"]) == (2024, None, "6.693")
+    assert (data["0056"][0]["dividend_year"], data["0056"][0]["dividend_quarter"], data["0056"][0]["dividend_date"]) == (2025, 2, "2025-07-16")
+    assert list(parser.data["errors"]) == ["QQQ"]
@@ -0,0 +1,85 @@
+import csv
+import io
+
+from data.twse import dividend_announcement
+from data.twse.dividend_announcement import TwseDividendAnnouncementMarketsParser, TwseDividendAnnouncementParser
+
+
+def _raw(stock_id: str, announcement_date: str, announcement_time: str) -> dict:
+    return {
+        "公司代號": stock_id,
+        "公司名稱": f"公司{stock_id}",
+        "股利所屬期間": "113年年度",
+        "權利分派基準日": "2025/07/01",
+        "現金股利-盈餘分配之股東現金股利(元/股)": "3.50000000",
+        "現金股利-除息交易日": "2025/06/12",
+        "公告日期": announcement_date,
+        "公告時間": announcement_time,
+        "普通股每股面額": "新台幣 10.0000元",
+    }
+
+
+def test_parser_dispatches_markets_mode():
+    assert isinstance(dividend_announcement.parser(True, True, year="2025"), TwseDividendAnnouncementMarketsParser)
+    assert isinstance(dividend_announcement.parser(True, True, stock_type="上櫃", year="2025"), TwseDividendAnnouncementParser)
+
+
+def test_one_market_sorted_by_stock_and_announcement():
+    parser = TwseDividendAnnouncementParser(True, True, "上市", "2025")
+    parser._data = [
+        _raw("2330", "2025/02/12", "16:00:00"),
+        _raw("1101", "2025/03/10", "17:30:00"),
+        _raw("2330", "2025/02/12", "08:00:00"),
+    ]
+
+    assert [(row["stock_id"], row["announcement_time"]) for row in parser.sorted_data] == [("1101", "17:30:00"), ("2330", "08:00:00"), ("2330", "16:00:00")]
+
+    data = parser.data
+    assert [row["stock_id"] for row in data] == ["1101", "2330", "2330"]
+    assert "announcement_time" not in data[0]
+    assert data[0]["cash_from_earning"] == "3.5"
+
+
+def _csv(rows: list[dict]) -> bytes:
+    text = io.StringIO()
+    writer = csv.DictWriter(text, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+    return text.getvalue().encode("big5")
+
+
+def _answer_by_market(files: dict[str, list[dict] | None]):
+    file_numbers = {"sii": "1", "otc": "2", "rotc": "3"}
+
+    def _answer(url, request_kw):
+        if url.endswith("ajax_t108sb27"):
+            # The query answers with the name of the file to download
+            typek = request_kw["data"]["TYPEK"]
+            return f"<input value='t108sb27_{file_numbers[typek]}_114.csv'>".encode() if files[typek] is not None else "<h4>查無符合條件之資料</h4>".encode()
+        typek = {number: typek for typek, number in file_numbers.items()}[request_kw["data"]["filename"].split("_")[1]]
+        return _csv(files[typek])
+
+    return _answer
+
+
+def test_markets_merged_in_global_order(stub_transport):
+    stub_transport(_answer_by_market({
+        "sii": [_raw("1101", "2025/03/10", "17:30:00"), _raw("2330", "2025/02/12", "16:00:00")],
+        "otc": [_raw("6488", "2025/02/20", "18:00:00"), _raw("1240", "2025/03/01", "09:00:00")],
+        "rotc": None,
+    }))
+
+    parser = TwseDividendAnnouncementMarketsParser(True, True, year="2025")
+    parser.parse_response()
+
+    data = parser.data
+    assert [(row["stock_id"], row["announcement_date"]) for row in data["data"]] == [
+        ("1101", "2025-03-10"),
+        ("1240", "2025-03-01"),
+        ("2330", "2025-02-12"),
+        ("6488", "2025-02-20"),
+    ]
+    assert "announcement_time" not in data["data"][0]
+    assert data["data"][0]["cash_from_earning"] == "3.5"
+    assert data["errors"] == {}
+    assert parser.data == data
@@ -0,0 +1,97 @@
+import asyncio
+import threading
+
+import pytest
+
+from curl_cffi import requests as curl_requests
+
+from data.twse import dividend
+from data.twse.dividend import TwseDividendHTMLParser, TwseDividendYearRangeParser
+
+
+def _page(year: int, stock_ids: list[str]) -> bytes:
+    parser = TwseDividendHTMLParser(True, True, "上市", year)
+    rows = [
+        "<tr>" + "".join(f"<th>{name}</th>" for name in header) + "</tr>"
+        for header in (parser.expect_header1, parser.expect_header2)
+    ]
+    for stock_id in stock_ids:
+        cells = [f"{stock_id} - 測試{stock_id}", "股東會確認", f"{year - 1912}年年度", "", "0", f"{year - 1911}/03/01", f"{year - 1911}/06/01"]
+        cells += ["1,000", "2,000", "3,000", "500", "2.5", "0", "0", "2,500", "0", "0", "0", "0", "無"]
+        rows.append("<tr>" + "".join(f"<td>{cell}</td>" for cell in cells) + "</tr>")
+    return f"<html><body><table class='hasBorder'>{''.join(rows)}</table></body></html>".encode("big5")
+
+
+def _stub_years(monkeypatch, stub_transport, pages: dict[int, bytes], events: list | None = None) -> None:
+    async def _answer(url, request_kw):
+        assert not request_kw["stream"]
+        year = int(url.split("YEAR=")[1].split("&")[0]) + 1911
+        if events is not None:
+            events.append(("download", year))
+        await asyncio.sleep(0.01)
+        if year not in pages:
+            raise curl_requests.exceptions.Timeout("Operation timed out")
+        return pages[year]
+
+    handle_response = TwseDividendHTMLParser.handle_response
+
+    def _handle_response(self, response):
+        if events is not None:
+            events.append(("parse", self.year, threading.get_ident()))
+        handle_response(self, response)
+
+    stub_transport(_answer)
+    monkeypatch.setattr(TwseDividendHTMLParser, "handle_response", _handle_response)
+
+
+def test_parser_dispatches_range_mode():
+    assert isinstance(dividend.parser(True, True, stock_type="上市", start_year="2012", end_year="2014"), TwseDividendYearRangeParser)
+    assert isinstance(dividend.parser(True, True, stock_type="上市", year="2014"), TwseDividendHTMLParser)
+
+
+def test_each_year_keeps_its_layout():
+    parser = TwseDividendYearRangeParser(True, True, "上櫃", start_year="2015", end_year="2022")
+
+    assert len(parser.create_parser(2015).expect_header1) == 18
+    assert len(parser.create_parser(2018).expect_header2) == 6
+    assert len(parser.create_parser(2022).expect_header2) == 8
+
+
+def test_years_parsed_off_the_event_loop_one_year_ahead(monkeypatch, stub_transport):
+    events = []
+    _stub_years(monkeypatch, stub_transport, {year: _page(year, ["2330"]) for year in range(2021, 2026)}, events)
+    loop_thread = threading.get_ident()
+
+    parser = TwseDividendYearRangeParser(True, True, "上市", start_year="2021", end_year="2025")
+    parser.parse_response()
+
+    assert [dividend["year"] for dividend in parser.data["data"]["2330"]] == [2021, 2022, 2023, 2024, 2025]
+    assert all(event[2] != loop_thread for event in events if event[0] == "parse")
+
+    # At most the page being parsed and the next one are held
+    held = 0
+    for event in events:
+        held += 1 if event[0] == "download" else -1
+        assert held <= dividend.MAX_PAGES_HELD
+
+
+def test_dividends_merged_by_stock(monkeypatch, stub_transport):
+    _stub_years(monkeypatch, stub_transport, {
+        2021: _page(2021, ["2330", "2021"]),
+        2023: _page(2023, ["2330", "2023"]),
+    })
+
+    parser = TwseDividendYearRangeParser(True, True, "上市", start_year="2021", end_year="2023")
+    parser.parse_response()
+
+    data = parser.data
+    assert list(data["data"]) == ["2330", "2021", "2023"]
+    assert [dividend["year"] for dividend in data["data"]["2330"]] == [2021, 2023]
+    assert data["data"]["2330"][0]["dividend_cash_per_share_from_earn"] == "2.5"
+    assert list(data["errors"]) == ["2022"]
+    assert "Timeout" in data["errors"]["2022"]["exception_type"]
+
+
+def test_range_rejects_reversed_years():
+    with pytest.raises(ValueError):
+        TwseDividendYearRangeParser(True, True, "上市", start_year="2022", end_year="2021")
@@ -0,0 +1,125 @@
+import json
+
+from datetime import date, datetime
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlsplit
+from unittest.mock import patch
+
+import pytest
+
+from data.constant import StockType
+from data.parser.circuit_breaker import CircuitState, get_circuit_breaker, reset_circuit_breakers
+from data.twse import price_ratio
+from data.twse.price_ratio import date_range
+from data.twse.price_ratio.date_range import NonTradingDates, TwsePriceRatioDateRangeParser
+
+
+def _public_body(rows: list[list[str]]) -> dict:
+    if not rows:
+        return {"stat": "很抱歉，沒有符合條件的資料!"}
+    return {
+        "stat": "OK",
+        "title": "個股日本益比、殖利率及股價淨值比",
+        "fields": ["證券代號", "證券名稱", "收盤價", "殖利率(%)", "股利年度", "本益比", "股價淨值比", "財報年/季"],
+        "data": rows,
+    }
+
+
+def _otc_body(rows: list[list[str]]) -> dict:
+    return {
+        "tables": [{"fields": ["股票代號", "名稱", "本益比", "每股股利", "股利年度", "殖利率(%)", "股價淨值比", "財報年/季"], "data": rows}],
+    }
+
+
+def _requested_key(url: str) -> tuple[StockType, date]:
+    query_date = parse_qs(urlsplit(url).query)["date"][0].replace("/", "")
+    stock_type = StockType.PUBLIC if urlsplit(url).hostname == "www.twse.com.tw" else StockType.OTC
+    return stock_type, datetime.strptime(query_date, "%Y%m%d").date()
+
+
+def _answer_by_date(public_rows: dict[date, list], otc_rows: dict[date, list]):
+    def _answer(url, request_kw):
+        stock_type, query_date = _requested_key(url)
+        if stock_type is StockType.PUBLIC:
+            return json.dumps(_public_body(public_rows.get(query_date, []))).encode()
+        return json.dumps(_otc_body(otc_rows.get(query_date, []))).encode()
+
+    return _answer
+
+
+def test_parser_dispatches_range_mode():
+    assert isinstance(price_ratio.parser(True, True, start_date="2025-01-02", end_date="2025-01-03"), TwsePriceRatioDateRangeParser)
+    assert isinstance(price_ratio.parser(True, True, stock_type="上櫃", query_date="2025-01-03"), price_ratio.TwseOTCPriceRatioParser)
+
+
+def test_trading_dates_skip_weekends_and_known_holidays_per_market(monkeypatch):
+    non_trading_dates = NonTradingDates()
+    non_trading_dates.add(StockType.OTC, date(2025, 1, 1))
+    monkeypatch.setattr(date_range, "_non_trading_dates", non_trading_dates)
+    parser = TwsePriceRatioDateRangeParser(True, True, start_date="2024-12-30", end_date="2025-01-06")
+
+    assert parser.trading_dates(StockType.OTC) == [date(2024, 12, 30), date(2024, 12, 31), date(2025, 1, 2), date(2025, 1, 3), date(2025, 1, 6)]
+    assert date(2025, 1, 1) in parser.trading_dates(StockType.PUBLIC)
+
+
+def test_learned_non_trading_dates_expire():
+    with patch("data.twse.price_ratio.date_range.time.monotonic") as mock_monotonic:
+        mock_monotonic.return_value = 100.0
+        non_trading_dates = NonTradingDates(ttl=60)
+        non_trading_dates.add(StockType.PUBLIC, date(2025, 1, 1))
+        assert non_trading_dates.get(StockType.PUBLIC) == {date(2025, 1, 1)}
+
+        mock_monotonic.return_value = 160.0
+        assert non_trading_dates.get(StockType.PUBLIC) == set()
+
+
+def test_range_results_from_both_markets(monkeypatch, stub_transport):
+    monkeypatch.setattr(date_range, "_non_trading_dates", NonTradingDates())
+    requested = stub_transport(_answer_by_date(
+        public_rows={
+            date(2006, 1, 2): [["2330", "台積電", "62.50", "4.00", "93", "18.33", "3.72", "094/3"]],
+            date(2006, 1, 3): [["2330", "台積電", "63.00", "3.97", "93", "18.48", "3.75", "094/3"]],
+        },
+        # No OTC data on 2006-01-03
+        otc_rows={date(2006, 1, 2): [["6488", "環球晶", "20.05", "1.50", "93", "3.12", "2.10", "094Q3"]]},
+    ))
+    parser = TwsePriceRatioDateRangeParser(True, True, start_date="2006-01-02", end_date="2006-01-03")
+    parser.parse_response()
+
+    data = parser.data
+    assert list(data["data"]) == ["2006-01-02", "2006-01-03"]
+    assert data["data"]["2006-01-02"]["上市"][0]["stock_id"] == "2330"
+    assert data["data"]["2006-01-02"]["上櫃"][0]["per"] == "20.05"
+    assert list(data["data"]["2006-01-03"]) == ["上市"]
+    assert data["errors"] == {}
+    assert {_requested_key(url) for url, _ in requested} == {
+        (StockType.PUBLIC, date(2006, 1, 2)), (StockType.OTC, date(2006, 1, 2)),
+        (StockType.PUBLIC, date(2006, 1, 3)), (StockType.OTC, date(2006, 1, 3)),
+    }
+
+    # The OTC "no data" answer does not hide the date from public queries
+    requested.clear()
+    TwsePriceRatioDateRangeParser(True, True, start_date="2006-01-03", end_date="2006-01-03", stock_type="上市").parse_response()
+    TwsePriceRatioDateRangeParser(True, True, start_date="2006-01-03", end_date="2006-01-03", stock_type="上櫃").parse_response()
+    assert [_requested_key(url) for url, _ in requested] == [(StockType.PUBLIC, date(2006, 1, 3))]
+
+
+def test_range_rejects_reversed_dates():
+    with pytest.raises(ValueError):
+        TwsePriceRatioDateRangeParser(True, True, start_date="2025-01-03", end_date="2025-01-02")
+
+
+def test_failures_swallowed_per_key_still_break_the_circuit(monkeypatch):
+    monkeypatch.setattr(date_range, "_non_trading_dates", NonTradingDates())
+    reset_circuit_breakers()
+
+    async def _request_async(self):
+        return SimpleNamespace(url=self.request_url, status_code=404)
+
+    monkeypatch.setattr(price_ratio.TwsePublicPriceRatioParser, "request_async", _request_async)
+    parser = TwsePriceRatioDateRangeParser(True, True, start_date="2025-01-06", end_date="2025-01-08", stock_type="上市")
+    parser.parse_response()
+
+    assert list(parser.data["errors"]) == ["2025-01-06 上市", "2025-01-07 上市", "2025-01-08 上市"]
+    assert get_circuit_breaker("www.twse.com.tw").state is CircuitState.OPEN
+    reset_circuit_breakers()
@@ -0,0 +1,98 @@
+import asyncio
+
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from data.exception import InvalidQuery, WrongDataFormat
+from data.parser import hedge
+from data.parser.circuit_breaker import CircuitState, get_circuit_breaker, reset_circuit_breakers
+from data.parser.hedge import HedgePolicy
+from data.twse.price_ratio.otc import TwseOTCPriceRatioParser
+from data.twse.price_ratio.public import TwsePublicPriceRatioParser
+
+
+def _fake_probes(monkeypatch, parser_class, dates_with_data: set[date], delays: dict[date, float] | None = None) -> dict:
+    probed = {}
+
+    async def _probe(self, probe):
+        probed[probe._working_date] = "started"
+        try:
+            await asyncio.sleep((delays or {}).get(probe._working_date, 0))
+        except asyncio.CancelledError:
+            probed[probe._working_date] = "cancelled"
+            raise
+        probed[probe._working_date] = "answered"
+        if probe._working_date in dates_with_data:
+            probe._data = [{"證券代號": "2330", "date": probe._working_date}]
+            return True
+        return False
+
+    monkeypatch.setattr(parser_class, "_probe", _probe)
+    return probed
+
+
+def test_candidate_dates_skip_weekends():
+    parser = TwsePublicPriceRatioParser(True, True, query_date="2025-02-03")
+    parser.probe_days = 4
+
+    assert parser.candidate_dates() == [date(2025, 2, 3), date(2025, 1, 31), date(2025, 1, 30), date(2025, 1, 29)]
+
+
+def test_most_recent_date_with_data_wins(monkeypatch):
+    # Lunar new year 2025, no trading from 01-23 to 01-31
+    probed = _fake_probes(monkeypatch, TwseOTCPriceRatioParser, {date(2025, 1, 22), date(2025, 1, 21)})
+    parser = TwseOTCPriceRatioParser(True, True, query_date="2025-02-02")
+    parser.parse_response()
+
+    assert parser._working_date == date(2025, 1, 22)
+    assert parser._data == [{"證券代號": "2330", "date": date(2025, 1, 22)}]
+    # Quick answers, one candidate after another and nothing older than 01-22
+    assert list(probed) == [date(2025, 1, 31), date(2025, 1, 30), date(2025, 1, 29), date(2025, 1, 28), date(2025, 1, 27), date(2025, 1, 24), date(2025, 1, 23), date(2025, 1, 22)]
+
+
+def test_only_the_query_date_requested_when_it_has_data(monkeypatch):
+    probed = _fake_probes(monkeypatch, TwsePublicPriceRatioParser, {date(2025, 1, 31), date(2025, 1, 30)})
+    parser = TwsePublicPriceRatioParser(True, True, query_date="2025-01-31")
+    parser.parse_response()
+
+    assert parser._working_date == date(2025, 1, 31)
+    assert probed == {date(2025, 1, 31): "answered"}
+
+
+def test_older_probes_join_a_slow_one_and_are_cancelled_once_it_answers(monkeypatch):
+    monkeypatch.setitem(hedge._hedge_policies, "www.twse.com.tw", HedgePolicy(default_delay=0.05))
+    probed = _fake_probes(monkeypatch, TwsePublicPriceRatioParser, {date(2025, 1, 31), date(2025, 1, 30)}, delays={date(2025, 1, 31): 0.3, date(2025, 1, 29): 1.0})
+    parser = TwsePublicPriceRatioParser(True, True, query_date="2025-02-01")
+    parser.parse_response()
+
+    # 01-30 answered first but the newer 01-31 wins, 01-29 is cancelled and not left pending
+    assert parser._working_date == date(2025, 1, 31)
+    assert probed == {date(2025, 1, 31): "answered", date(2025, 1, 30): "answered", date(2025, 1, 29): "cancelled"}
+
+
+def test_no_data_in_any_candidate(monkeypatch):
+    _fake_probes(monkeypatch, TwsePublicPriceRatioParser, set())
+    parser = TwsePublicPriceRatioParser(True, True, query_date="2025-02-03")
+
+    with pytest.raises(WrongDataFormat):
+        parser.parse_response()
+
+
+def test_future_query_date_does_not_open_the_circuit(monkeypatch):
+    reset_circuit_breakers()
+
+    async def _request_async(self):
+        return SimpleNamespace(
+            url=self.request_url,
+            status_code=200,
+            json=lambda: {"stat": "查詢日期大於今日，請重新查詢!"},
+        )
+
+    monkeypatch.setattr(TwsePublicPriceRatioParser, "request_async", _request_async)
+    for _ in range(3):
+        with pytest.raises(InvalidQuery):
+            TwsePublicPriceRatioParser(True, True, query_date="3000-02-12").parse_response()
+
+    assert get_circuit_breaker("www.twse.com.tw").state is CircuitState.CLOSED
@@ -0,0 +1,119 @@
+import asyncio
+
+from datetime import date
+
+import pytest
+
+from data.constant import StockType
+from data.exception import BlockingByWebsiteError
+from data.twse import stocks_balance_sheet, stocks_profit_sheet
+from data.twse.period_range import last_published
+from data.twse.stocks_balance_sheet import TwseStocksBalanceSheetParser, TwseStocksBalanceSheetRangeParser
+from data.twse.stocks_profit_sheet import TwseStocksProfitSheetParser, TwseStocksProfitSheetRangeParser
+
+
+def test_parser_dispatches_range_mode():
+    assert isinstance(stocks_balance_sheet.parser(True, True, start_year=2024, start_quarter=1), TwseStocksBalanceSheetRangeParser)
+    assert isinstance(stocks_balance_sheet.parser(True, True, year=2024, stock_type="上市", quarter=1), TwseStocksBalanceSheetParser)
+    assert isinstance(stocks_profit_sheet.parser(True, True, start_year=2024, start_quarter=1), TwseStocksProfitSheetRangeParser)
+    assert isinstance(stocks_profit_sheet.parser(True, True, year=2024, stock_type="上櫃", quarter=1), TwseStocksProfitSheetParser)
+
+
+def test_quarters_across_years():
+    parser = TwseStocksProfitSheetRangeParser(True, True, start_year=2023, start_quarter=3, end_year=2024, end_quarter=2, stock_types=["上市"])
+
+    assert parser.quarters() == [(2023, 3), (2023, 4), (2024, 1), (2024, 2)]
+    assert parser.stock_types == (StockType.PUBLIC,)
+
+    sub_parser = parser.create_parser((2023, 4, StockType.PUBLIC))
+    assert isinstance(sub_parser, TwseStocksProfitSheetParser)
+    assert (sub_parser.year, sub_parser.quarter, sub_parser.stock_type) == (2023, 4, StockType.PUBLIC)
+
+
+class _FakeTableParser:
+
+    def __init__(self, events: list, parser) -> None:
+        self.events = events
+        self.parser = parser
+
+    async def parse_response_async(self) -> None:
+        if self.parser.stock_type is StockType.ROTC and self.parser.quarter == 1:
+            raise RuntimeError("Row size not match")
+        await asyncio.sleep(0.01)
+        self.events.append(("fetched", self.parser.year, self.parser.quarter, self.parser.stock_type))
+
+    @property
+    def data(self):
+        return [{"id": "2330", "year": self.parser.year}]
+
+
+@pytest.mark.parametrize("today, quarter", [
+    (date(2025, 3, 31), (2024, 3)),
+    (date(2025, 4, 1), (2024, 4)),
+    (date(2025, 5, 15), (2024, 4)),
+    (date(2025, 5, 16), (2025, 1)),
+    (date(2025, 11, 15), (2025, 3)),
+    (date(2026, 1, 10), (2025, 3)),
+])
+def test_last_published_quarter_after_its_filing_deadline(today, quarter):
+    assert last_published(4, today) == quarter
+
+
+def test_range_ends_at_the_last_published_quarter():
+    today = date.today()
+    parser = TwseStocksBalanceSheetRangeParser(True, True, start_year=today.year - 1, start_quarter=1)
+
+    assert parser.quarters()[-1] == last_published(4, today)
+    assert parser.stock_types == (StockType.PUBLIC, StockType.OTC, StockType.ROTC)
+
+
+def _fake_hops(monkeypatch, parser_class, events: list) -> None:
+    async def _request_async(self):
+        await asyncio.sleep(0)
+        return self
+
+    def _get_redirect_url(self, response):
+        if self.stock_type is StockType.PUBLIC and self.quarter == 1:
+            raise BlockingByWebsiteError("THE PAGE CANNOT BE ACCESSED!")
+        events.append(("resolved", self.year, self.quarter, self.stock_type))
+        return f"https://mopsov.twse.com.tw/{self.year}/{self.quarter}"
+
+    monkeypatch.setattr(parser_class, "request_async", _request_async)
+    monkeypatch.setattr(parser_class, "get_redirect_url", _get_redirect_url)
+    monkeypatch.setattr(parser_class, "get_internal_parser", lambda self, url: _FakeTableParser(events, self))
+
+
+def test_range_results_keyed_by_quarter(monkeypatch):
+    events = []
+    _fake_hops(monkeypatch, TwseStocksBalanceSheetParser, events)
+    parser = TwseStocksBalanceSheetRangeParser(True, True, start_year=2024, start_quarter=4, end_year=2025, end_quarter=1, stock_types=["上市", "興櫃"])
+    parser.parse_response()
+
+    assert parser.data["data"] == {
+        "2024Q4": {"上市": [{"id": "2330", "year": 2024}], "興櫃": [{"id": "2330", "year": 2024}]},
+    }
+    assert list(parser.data["errors"]) == ["2025Q1 上市", "2025Q1 興櫃"]
+    assert parser.data["errors"]["2025Q1 上市"]["exception_type"] == str(BlockingByWebsiteError)
+
+
+def test_redirects_resolved_ahead_of_table_fetches(monkeypatch):
+    events = []
+    _fake_hops(monkeypatch, TwseStocksProfitSheetParser, events)
+    parser = TwseStocksProfitSheetRangeParser(True, True, start_year=2023, start_quarter=2, end_year=2024, end_quarter=4, stock_types=["上櫃"], max_concurrency=1)
+    parser.parse_response()
+
+    # Every redirect is resolved while the single table fetcher is still busy with the first ones
+    resolved = [index for index, event in enumerate(events) if event[0] == "resolved"]
+    fetched = [index for index, event in enumerate(events) if event[0] == "fetched"]
+    assert len(resolved) == len(fetched) == 7
+    assert max(resolved) < fetched[1]
+    assert list(parser.data["data"]) == ["2023Q2", "2023Q3", "2023Q4", "2024Q1", "2024Q2", "2024Q3", "2024Q4"]
+
+
+@pytest.mark.parametrize("kw", [
+    {"start_year": 2025, "start_quarter": 2, "end_year": 2025, "end_quarter": 1},
+    {"start_year": 2025, "start_quarter": 5},
+])
+def test_range_rejects_invalid_quarters(kw):
+    with pytest.raises(ValueError):
+        TwseStocksBalanceSheetRangeParser(True, True, **kw)
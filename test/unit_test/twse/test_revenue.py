@@ -0,0 +1,88 @@
+from datetime import date
+
+import pytest
+
+from data.exception import WrongDataFormat
+from data.twse import period_range, revenue
+from data.twse.revenue import TwseRevenueParser, TwseRevenueRangeParser
+
+
+HEADER = "出表日期,資料年月,公司代號,公司名稱,產業別,營業收入-當月營收,營業收入-上月營收,營業收入-去年當月營收,營業收入-上月比較增減(%),營業收入-去年同月增減(%),累計營業收入-當月累計營收,累計營業收入-去年累計營收,累計營業收入-前期比較增減(%),備註"
+CSV = "\n".join([
+    HEADER,
+    '114/02/10,114/1,2330,台積電,半導體業,293288251,278163107,215785127,5.43,35.91,293288251,215785127,35.91,-',
+    '114/02/10,114/1,2317,鴻海,其他電子業,0,-,1,"1,000","2","3",4,5,"第一行\n第二行"',
+]).encode("utf-8-sig")
+
+
+def _feed(parser: TwseRevenueParser, content: bytes, size: int) -> None:
+    for start in range(0, len(content), size):
+        parser.handle_response_chunk(None, content[start:start + size])
+    parser.handle_response_end(None)
+
+
+@pytest.mark.parametrize("size", [1, 7, len(CSV)])
+def test_rows_parsed_while_streaming(size):
+    parser = TwseRevenueParser(True, True, "上市", 2025, 1)
+    _feed(parser, CSV, size)
+
+    assert [row["stock_id"] for row in parser.data] == ["2330", "2317"]
+    assert parser.data[0]["create_time"] == "2025-02-10"
+    assert parser.data[0]["value"] == "293288251000"
+    assert parser.data[0]["note"] is None
+    assert parser.data[1]["value"] == "0"
+    assert parser.data[1]["last_month"] is None
+    assert parser.data[1]["last_month_percent"] == "1,000"
+    assert parser.data[1]["note"] == "第一行\n第二行"
+
+
+def test_file_of_another_month_rejected():
+    parser = TwseRevenueParser(True, True, "上市", 2025, 2)
+    with pytest.raises(WrongDataFormat):
+        _feed(parser, CSV, 64)
+
+
+def test_empty_file_has_no_rows():
+    parser = TwseRevenueParser(True, True, "上市", 2025, 1)
+    _feed(parser, b"", 64)
+
+    assert parser.data == []
+
+
+def test_range_months_across_years():
+    parser = revenue.parser(True, True, start_year=2024, start_month=11, end_year=2025, end_month=2, stock_types=["上市", "上櫃"])
+
+    assert isinstance(parser, TwseRevenueRangeParser)
+    assert parser.months() == [(2024, 11), (2024, 12), (2025, 1), (2025, 2)]
+    assert isinstance(revenue.parser(True, True, stock_type="興櫃", year=2025, month=1), TwseRevenueParser)
+
+
+def test_range_results_keyed_by_month(stub_transport):
+    requested = stub_transport(lambda url, request_kw: CSV)
+    parser = TwseRevenueRangeParser(True, True, start_year=2024, start_month=12, end_year=2025, end_month=1, stock_types="上市")
+    parser.parse_response()
+
+    assert sorted((request_kw["data"]["filePath"], request_kw["data"]["fileName"]) for _, request_kw in requested) == [("/t21/sii/", "t21sc03_113_12.csv"), ("/t21/sii/", "t21sc03_114_1.csv")]
+    assert list(parser.data["data"]) == ["2025-01"]
+    assert [row["stock_id"] for row in parser.data["data"]["2025-01"]["上市"]] == ["2330", "2317"]
+    # The file of 2025-01 served for 2024-12
+    assert list(parser.data["errors"]) == ["2024-12 上市"]
+    assert "WrongDataFormat" in parser.data["errors"]["2024-12 上市"]["exception_type"]
+
+
+@pytest.mark.parametrize("today, month", [(date(2025, 1, 1), (2024, 12)), (date(2025, 3, 31), (2025, 2))])
+def test_range_ends_at_the_previous_month(monkeypatch, today, month):
+    class _Date(date):
+        @classmethod
+        def today(cls):
+            return today
+
+    monkeypatch.setattr(period_range, "date", _Date)
+    parser = TwseRevenueRangeParser(True, True, start_year=2024, start_month=11, end_year=2025)
+
+    assert parser.months()[-1] == month
+
+
+def test_range_rejects_reversed_months():
+    with pytest.raises(ValueError):
+        TwseRevenueRangeParser(True, True, start_year=2025, start_month=2, end_year=2025, end_month=1)
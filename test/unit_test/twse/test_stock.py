@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from data.cnyes.stock_price_history import CnyesStocksPriceHistoryParser
+from data.constant import StockType
+from data.exception import BlockingByWebsiteError
+from data.parser.loop import run
+from data.twse import stock
+from data.twse.stock import TwseStockParser, TwseStocksParser
+
+
+class _FakeListingParser:
+
+    def __init__(self, parser) -> None:
+        self.parser = parser
+
+    async def parse_response_async(self) -> None:
+        await asyncio.sleep(0)
+
+    @property
+    def data(self):
+        return [{"id": {StockType.PUBLIC: "2330", StockType.OTC: "6488", StockType.ROTC: "7566"}[self.parser.stock_type]}]
+
+
+def _fake_hops(monkeypatch, resolved: list, blocked: StockType | None = None) -> None:
+    async def _request_async(self):
+        return self
+
+    def _get_redirect_url(self, response):
+        if self.stock_type is blocked:
+            raise BlockingByWebsiteError("THE PAGE CANNOT BE ACCESSED!")
+        resolved.append(self.stock_type)
+        return f"https://mopsov.twse.com.tw/{self.stock_type.name}"
+
+    monkeypatch.setattr(TwseStockParser, "request_async", _request_async)
+    monkeypatch.setattr(TwseStockParser, "get_redirect_url", _get_redirect_url)
+    monkeypatch.setattr(TwseStockParser, "get_internal_parser", lambda self, url: _FakeListingParser(self))
+
+
+def test_parser_dispatches_stock_types_mode():
+    assert isinstance(stock.parser(True, True, stock_types=["上市", "上櫃"]), TwseStocksParser)
+    assert isinstance(stock.parser(True, True, stock_type="上市"), TwseStockParser)
+
+
+def test_listings_keyed_by_stock_type(monkeypatch):
+    resolved = []
+    _fake_hops(monkeypatch, resolved, blocked=StockType.OTC)
+    parser = TwseStocksParser(True, True, timeout="10")
+    parser.parse_response()
+
+    assert sorted(resolved, key=lambda stock_type: stock_type.name) == [StockType.PUBLIC, StockType.ROTC]
+    assert parser.data["data"] == {"上市": [{"id": "2330"}], "興櫃": [{"id": "7566"}]}
+    assert list(parser.data["errors"]) == ["上櫃"]
+
+
+def test_all_stocks_listed_through_the_redirects(monkeypatch):
+    resolved = []
+    _fake_hops(monkeypatch, resolved)
+    parser = CnyesStocksPriceHistoryParser(True, True, stock_ids="all", start_date_included="2025-01-02")
+
+    assert run(parser.keys_async()) == ["2330", "6488"]
+    assert set(resolved) == {StockType.PUBLIC, StockType.OTC}
+
+
+def test_partial_listing_rejected(monkeypatch):
+    _fake_hops(monkeypatch, [], blocked=StockType.OTC)
+    parser = CnyesStocksPriceHistoryParser(True, True, stock_ids="all", start_date_included="2025-01-02")
+
+    with pytest.raises(Exception, match="Unable to list stocks"):
+        run(parser.keys_async())